@@ -1,11 +1,27 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import plotly.express as px
-import matplotlib.pyplot as plt
-import random
+import os
+from functools import partial
 from datetime import datetime, timedelta
+from synthetic_data import generate_synthetic_data, DEFAULT_SEED
+from follow_up_store import FollowUpStore, seed_demo_follow_ups, ONGOING_STATUSES, REJECTED_STATUSES, TRANSITIONS
+from entity_store import build_entity_store, entity_position, entity_label
+from cohort_assignment import assign_cohort, assignment_frame
+from scoring_profiles import load_scoring_profiles, scoring_plan, DEFAULT_PROFILE, SCORING_PROFILES_PATH
+from hard_constraints import HARD_CONSTRAINTS, build_constraint_index, eligible_offers, eligible_young_people, constraint_mask
+from card_templates import (
+    CARD_CSS, COMPONENT_LABELS, young_cards, offer_cards, offer_match_cards, young_match_cards, follow_up_cards, card_block
+)
+from pagination import PageCache, PAGE_SIZES, DEFAULT_PAGE_SIZE, page_count
+from typed_frames import type_frames, category_mask, category_counts, to_csr, csr_any_of, csr_labels, FilterMaskCache, combine_masks
+from matching_engine import (
+    build_vocabularies, encode_young_people, encode_job_offers, take_rows,
+    build_offer_index, build_young_index, candidate_offers, candidate_young_people, top_k, score_histogram,
+    MatchMatrix, TextSimilarityIndex, young_profile_texts, offer_profile_texts, blend_scores, blended_min_exact_score,
+    load_commune_coordinates, distance_matrix, within_mobility, COMPONENTS
+)
 
 # Configuration de la page
 st.set_page_config(
@@ -69,162 +85,212 @@ st.markdown("""
         color: #666;
         font-size: 0.8rem;
     }
+    """ + CARD_CSS + """
     </style>
     """, unsafe_allow_html=True)
 
-# Données simulées
+# Données simulées (tirage reproductible : même graine pour toutes les instances, dates relatives au jour courant)
 @st.cache_data
 def generate_dummy_data():
-    # Données des jeunes
-    skills = ['Communication', 'Travail d\'équipe', 'Autonomie', 'Rigueur', 'Informatique', 
-              'Langues étrangères', 'Vente', 'Service client', 'Gestion de projet', 'Marketing digital']
-    
-    sectors = ['Commerce', 'Administratif', 'Restauration', 'Informatique', 'Industrie', 
-               'Santé', 'Communication', 'Logistique', 'BTP', 'Services']
-    
-    contract_types = ['CDI', 'CDD', 'Alternance', 'Stage', 'Intérim']
-    
-    locations = ['Chartres Centre', 'Chartres Nord', 'Chartres Sud', 'Lucé', 'Mainvilliers', 
-                'Luisant', 'Champhol', 'Lèves', 'Le Coudray', 'Barjouville']
-    
-    qualifications = ['Sans diplôme', 'CAP/BEP', 'Bac', 'Bac+2', 'Bac+3 et plus']
-    
-    young_people = []
-    for i in range(30):
-        young_skills = random.sample(skills, random.randint(3, 6))
-        preferred_sectors = random.sample(sectors, random.randint(2, 4))
-        preferred_contracts = random.sample(contract_types, random.randint(1, 3))
-        
-        young_person = {
-            'id': f'J{i+1:03d}',
-            'name': f'Jeune {i+1}',
-            'age': random.randint(18, 26),
-            'qualification': random.choice(qualifications),
-            'skills': young_skills,
-            'preferred_sectors': preferred_sectors,
-            'preferred_contracts': preferred_contracts,
-            'mobility': random.randint(5, 30),
-            'preferred_location': random.choice(locations),
-            'experience_years': random.randint(0, 5),
-            'registration_date': (datetime.now() - timedelta(days=random.randint(1, 365))).strftime('%Y-%m-%d'),
-            'last_appointment': (datetime.now() - timedelta(days=random.randint(1, 90))).strftime('%Y-%m-%d'),
-            'status': random.choice(['En recherche active', 'En formation', 'En emploi partiel', 'Nouveau'])
-        }
-        young_people.append(young_person)
-    
-    # Données des entreprises et offres d'emploi
-    companies = []
-    job_offers = []
-    
-    company_names = [
-        'Tech Solutions', 'MarketPro', 'Restaurant Gourmet', 'Logistique Express', 
-        'Bâtiment Durable', 'InfoSys', 'Santé Plus', 'Commerce Factory', 
-        'Admin Services', 'Communication Créative'
-    ]
-    
-    job_titles = {
-        'Commerce': ['Vendeur', 'Responsable magasin', 'Assistant commercial'],
-        'Administratif': ['Assistant administratif', 'Secrétaire', 'Agent d\'accueil'],
-        'Restauration': ['Serveur', 'Cuisinier', 'Commis de cuisine'],
-        'Informatique': ['Développeur', 'Technicien informatique', 'Support technique'],
-        'Industrie': ['Opérateur de production', 'Technicien de maintenance', 'Magasinier'],
-        'Santé': ['Aide-soignant', 'Agent de service hospitalier', 'Secrétaire médical'],
-        'Communication': ['Assistant communication', 'Community manager', 'Chargé d\'événementiel'],
-        'Logistique': ['Préparateur de commandes', 'Cariste', 'Agent logistique'],
-        'BTP': ['Maçon', 'Électricien', 'Peintre'],
-        'Services': ['Agent d\'entretien', 'Auxiliaire de vie', 'Agent de sécurité']
+    return generate_synthetic_data(
+        n_young=30, n_companies=10, seed=DEFAULT_SEED, reference_date=datetime.now().strftime('%Y-%m-%d')
+    )
+
+# Charger les données simulées, typées en catégories à ordre fixe et petits entiers
+@st.cache_data
+def load_typed_data():
+    return type_frames(*generate_dummy_data())
+
+young_people_df, companies_df, job_offers_df, memory_report = load_typed_data()
+
+# Colonnes multi-valuées au format CSR (décalages + codes) pour les filtres "au moins un / tous"
+@st.cache_data
+def load_list_columns():
+    young_people_df, _, job_offers_df, _ = load_typed_data()
+    young_people_lists = {
+        column: to_csr(young_people_df[column]) for column in ['skills', 'preferred_sectors', 'preferred_contracts']
     }
-    
-    for i in range(10):
-        company = {
-            'id': f'E{i+1:03d}',
-            'name': company_names[i],
-            'sector': random.choice(sectors),
-            'size': random.choice(['TPE', 'PME', 'Grande entreprise']),
-            'location': random.choice(locations),
-            'contact_person': f'Contact {i+1}',
-            'last_contact': (datetime.now() - timedelta(days=random.randint(1, 120))).strftime('%Y-%m-%d'),
-            'partnership_level': random.choice(['Nouveau', 'Régulier', 'Partenaire privilégié'])
-        }
-        companies.append(company)
-        
-        # Génération des offres d'emploi pour chaque entreprise
-        for j in range(random.randint(1, 3)):
-            sector = company['sector']
-            job_title = random.choice(job_titles.get(sector, ['Employé']))
-            
-            required_skills = random.sample(skills, random.randint(2, 5))
-            
-            job_offer = {
-                'id': f'O{i+1:03d}_{j+1}',
-                'company_id': company['id'],
-                'company_name': company['name'],
-                'title': job_title,
-                'sector': sector,
-                'contract_type': random.choice(contract_types),
-                'required_qualification': random.choice(qualifications),
-                'required_skills': required_skills,
-                'required_experience': random.choice([0, 1, 2, 3]),
-                'location': company['location'],
-                'publication_date': (datetime.now() - timedelta(days=random.randint(1, 30))).strftime('%Y-%m-%d'),
-                'status': random.choice(['Active', 'Pourvu', 'En attente']),
-                'applications': random.randint(0, 10)
-            }
-            job_offers.append(job_offer)
-    
-    return pd.DataFrame(young_people), pd.DataFrame(companies), pd.DataFrame(job_offers)
+    job_offers_lists = {'required_skills': to_csr(job_offers_df['required_skills'])}
+    return young_people_lists, job_offers_lists
 
-# Charger les données simulées
-young_people_df, companies_df, job_offers_df = generate_dummy_data()
+young_people_lists, job_offers_lists = load_list_columns()
 
-# Fonction pour calculer le score de matching
-def calculate_match_score(young_person, job_offer):
-    score = 0
-    max_score = 0
-    
-    # Match sur les compétences
-    skill_overlap = set(young_person['skills']).intersection(set(job_offer['required_skills']))
-    skill_score = len(skill_overlap) / max(len(job_offer['required_skills']), 1) * 40
-    score += skill_score
-    max_score += 40
-    
-    # Match sur le secteur
-    sector_match = job_offer['sector'] in young_person['preferred_sectors']
-    sector_score = 20 if sector_match else 0
-    score += sector_score
-    max_score += 20
-    
-    # Match sur le type de contrat
-    contract_match = job_offer['contract_type'] in young_person['preferred_contracts']
-    contract_score = 15 if contract_match else 0
-    score += contract_score
-    max_score += 15
-    
-    # Match sur la qualification
-    qualification_levels = {'Sans diplôme': 0, 'CAP/BEP': 1, 'Bac': 2, 'Bac+2': 3, 'Bac+3 et plus': 4}
-    young_qual_level = qualification_levels.get(young_person['qualification'], 0)
-    job_qual_level = qualification_levels.get(job_offer['required_qualification'], 0)
-    
-    # Le jeune peut avoir une qualification supérieure à celle requise
-    qualification_score = 10 if young_qual_level >= job_qual_level else 0
-    score += qualification_score
-    max_score += 10
-    
-    # Match sur l'expérience
-    experience_match = young_person['experience_years'] >= job_offer['required_experience']
-    experience_score = 10 if experience_match else 0
-    score += experience_score
-    max_score += 10
-    
-    # Match sur la localisation et la mobilité
-    same_location = young_person['preferred_location'] == job_offer['location']
-    location_score = 5 if same_location else 0
-    score += location_score
-    max_score += 5
-    
-    # Calcul du pourcentage final
-    match_percentage = (score / max_score) * 100 if max_score > 0 else 0
-    return round(match_percentage)
+# Identifiant -> position de ligne et libellés d'affichage, reconstruits seulement quand les données changent
+@st.cache_data
+def load_entity_store():
+    return build_entity_store(*load_typed_data()[:3])
+
+entity_store = load_entity_store()
+
+# Version des données simulées (elles ne dépendent que de la graine et de la date de référence)
+DATA_VERSION = f"{DEFAULT_SEED}-{datetime.now().strftime('%Y-%m-%d')}"
+
+# Masques des filtres, mis en cache (LRU partagé entre pages et sessions) et combinés par ET sur la table complète
+@st.cache_resource
+def load_mask_cache():
+    return FilterMaskCache()
+
+FILTER_TABLES = {'young': (young_people_df, young_people_lists), 'offers': (job_offers_df, job_offers_lists)}
+
+def filter_mask(table, column, values):
+    df, lists = FILTER_TABLES[table]
+    if column in lists:
+        compute = lambda: csr_any_of(lists[column], values)
+    else:
+        compute = lambda: category_mask(df[column], values)
+    return load_mask_cache().mask(DATA_VERSION, table, column, values, compute)
+
+# Lignes retenues par une liste de filtres (colonne, valeurs) ; les filtres vides sont ignorés
+def filter_rows(table, filters):
+    return combine_masks(
+        [filter_mask(table, column, values) for column, values in filters if values], len(FILTER_TABLES[table][0])
+    )
+
+# Pages de cartes déjà extraites (page affichée et page suivante préparée)
+@st.cache_resource
+def load_page_cache():
+    return PageCache()
+
+# Taille de page et boutons précédent / suivant (page courante gardée dans l'état de session de la liste)
+def pagination_controls(key, total):
+    page_size = st.selectbox(
+        "Résultats par page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE), key=f"{key}_page_size"
+    )
+    n_pages = page_count(total, page_size)
+    page = min(st.session_state.get(f"{key}_page", 0), n_pages - 1)
+    st.session_state[f"{key}_page"] = page
+    
+    def move(step):
+        st.session_state[f"{key}_page"] = page + step
+    
+    col_previous, col_page, col_next = st.columns([1, 2, 1])
+    col_previous.button("◀ Précédent", key=f"{key}_previous", disabled=page == 0, on_click=move, args=(-1,))
+    col_page.markdown(f"<p style='text-align: center;'>Page {page + 1} / {n_pages}</p>", unsafe_allow_html=True)
+    col_next.button("Suivant ▶", key=f"{key}_next", disabled=page >= n_pages - 1, on_click=move, args=(1,))
+    return page, page_size
+
+# Facettes : nombre de résultats par valeur d'une colonne
+def facet_caption(label, counts):
+    return f"**{label} :** " + " · ".join(f"{value} ({count})" for value, count in counts.items())
+
+# Suivi des mises en relation (journal sur disque partagé entre les sessions) ; un historique de
+# démonstration est créé au premier lancement
+@st.cache_resource
+def load_follow_up_store():
+    store = FollowUpStore()
+    if len(store) == 0:
+        seed_demo_follow_ups(store, young_people_df, job_offers_df, seed=DEFAULT_SEED)
+    return store
+
+# Encodage des compétences, secteurs et contrats en masques de bits (une seule fois au chargement)
+# et index inversés compétence/secteur/contrat -> offres et -> jeunes
+@st.cache_data
+def encode_dummy_data():
+    young_people_df, _, job_offers_df, _ = load_typed_data()
+    vocabularies = build_vocabularies(young_people_df, job_offers_df)
+    young_people_encoded = encode_young_people(young_people_df, vocabularies)
+    job_offers_encoded = encode_job_offers(job_offers_df, vocabularies)
+    return (
+        vocabularies, young_people_encoded, job_offers_encoded,
+        build_young_index(young_people_encoded, vocabularies), build_offer_index(job_offers_encoded, vocabularies)
+    )
+
+vocabularies, young_people_encoded, job_offers_encoded, young_people_index, job_offers_index = encode_dummy_data()
+
+# Distances entre communes (table de coordonnées hors ligne), calculées une seule fois
+@st.cache_data
+def load_location_distances():
+    return distance_matrix(vocabularies['locations'], load_commune_coordinates())
+
+location_distances = load_location_distances()
+
+# Profils de score (fichier de configuration) ; chaque profil est compilé une fois en plan de score.
+# Le fichier est relu quand il change (profil appris ajouté par train_scoring_profile.py)
+@st.cache_data
+def load_profiles(modified_at):
+    return load_scoring_profiles()
+
+scoring_profiles = load_profiles(os.path.getmtime(SCORING_PROFILES_PATH))
+default_plan = scoring_plan(scoring_profiles[DEFAULT_PROFILE])
+
+# Matrice des scores jeunes x offres partagée entre les pages et les sessions, mise à jour incrémentalement
+# (une matrice par mode de localisation et par profil, identifié par son empreinte : revenir à un profil
+# déjà utilisé ne recalcule rien)
+@st.cache_resource
+def load_match_matrix(geographic=False, plan_hash=default_plan['hash'], _plan=default_plan):
+    return MatchMatrix(young_people_encoded, job_offers_encoded, location_distances if geographic else None, _plan)
+
+def match_matrix(mobility_mode, plan):
+    return load_match_matrix(mobility_mode != "Même commune", plan['hash'], plan)
+
+# Niveaux de qualification précalculés pour les contraintes strictes (par profil)
+@st.cache_resource
+def load_constraint_index(plan_hash=default_plan['hash'], _plan=default_plan):
+    return build_constraint_index(young_people_encoded, job_offers_encoded, _plan)
+
+# Index TF-IDF des compétences, intitulés et secteurs (mode "proximité des libellés")
+@st.cache_resource
+def load_text_index():
+    return TextSimilarityIndex(young_profile_texts(young_people_df), offer_profile_texts(job_offers_df))
+
+text_index = load_text_index()
+
+# Scores de matching pour des sous-ensembles filtrés (les lignes sont retrouvées par leur index d'origine)
+def match_scores(young_subset, offers_subset, semantic=False, mobility_mode="Même commune", plan=default_plan):
+    young_positions = young_people_df.index.get_indexer(young_subset.index)
+    offer_positions = job_offers_df.index.get_indexer(offers_subset.index)
+    scores = match_matrix(mobility_mode, plan).submatrix(young_positions, offer_positions)
+    # Les offres clôturées (score -1 dans la matrice) restent exclues après le mélange avec la similarité
+    excluded = scores < 0
+    if semantic:
+        scores = blend_scores(scores, text_index.similarity(young_positions, offer_positions))
+    if mobility_mode == "Rayon de mobilité (obligatoire)":
+        # Les offres hors du rayon de mobilité sont exclues (score négatif, sous tout score minimum)
+        excluded |= ~within_mobility(
+            take_rows(young_people_encoded, young_positions), take_rows(job_offers_encoded, offer_positions), location_distances
+        )
+    return np.where(excluded, -1, scores)
+
+YOUNG_MATCH_COLUMNS = ['id', 'name', 'age', 'qualification', 'experience_years', 'skills', 'preferred_location']
+OFFER_MATCH_COLUMNS = ['id', 'company_name', 'title', 'sector', 'contract_type', 'location']
+
+# Les k meilleurs résultats (sélection partielle) : seules ces lignes sont converties en DataFrame
+def top_matches(candidates_df, scores, columns, id_column, k, min_score=0):
+    kept = np.flatnonzero(scores >= min_score)
+    top = kept[top_k(scores[kept], candidates_df['id'].to_numpy()[kept], k)]
+    match_df = candidates_df.iloc[top][columns].rename(columns={'id': id_column})
+    match_df['match_score'] = scores[top]
+    return match_df
+
+# Détail du score par critère des résultats affichés (lu dans la matrice des scores, sans nouveau calcul) :
+# une colonne points_<critère> par critère
+def add_score_components(match_df, young_subset, offers_subset, mobility_mode="Même commune", plan=default_plan):
+    young_positions = young_people_df.index.get_indexer(young_subset.index)
+    offer_positions = job_offers_df.index.get_indexer(offers_subset.index)
+    components = match_matrix(mobility_mode, plan).component_submatrix(young_positions, offer_positions)
+    components = components.ravel()
+    for criterion in COMPONENTS:
+        match_df[f'points_{criterion}'] = components[criterion]
+    return match_df
+
+# Vue "Détail du score" : part du score obtenue par critère pour chaque résultat, barres empilées et tableau
+def display_score_details(match_df, name_column, key, semantic=False, plan=default_plan):
+    with st.expander("Détail du score"):
+        if semantic:
+            st.caption("Le score affiché combine ces critères avec la proximité des libellés (TF-IDF).")
+        points_columns = [f'points_{criterion}' for criterion in COMPONENTS]
+        details = match_df[[name_column] + points_columns].rename(
+            columns={f'points_{criterion}': label for criterion, label in COMPONENT_LABELS.items()}
+        )
+        fig = px.bar(
+            details.melt(id_vars=name_column, var_name='Critère', value_name='Points'),
+            x='Points', y=name_column, color='Critère', orientation='h',
+            color_discrete_sequence=px.colors.sequential.Teal[1:]
+        )
+        fig.update_layout(height=max(250, 45 * len(details)), xaxis_range=[0, 100])
+        st.plotly_chart(fig, use_container_width=True, key=key)
+        weights = pd.DataFrame([plan['component_weights']], index=['Poids']).rename(columns=COMPONENT_LABELS)
+        st.dataframe(pd.concat([details.set_index(name_column), weights]), use_container_width=True)
 
 # Interface utilisateur Streamlit
 def main():
@@ -263,17 +329,28 @@ def main():
             default=[]
         )
     
+    # Profil de score (pondération des critères) pour les pages qui calculent des scores
+    plan = default_plan
+    if page in ["Tableau de bord", "Offres d'emploi", "Matching"]:
+        profile_name = st.sidebar.selectbox(
+            "Profil de score",
+            options=list(scoring_profiles),
+            index=list(scoring_profiles).index(DEFAULT_PROFILE)
+        )
+        st.sidebar.caption(scoring_profiles[profile_name].get('description', ''))
+        plan = scoring_plan(scoring_profiles[profile_name])
+    
     st.sidebar.markdown('</div>', unsafe_allow_html=True)
     
     # Contenu principal selon la page sélectionnée
     if page == "Tableau de bord":
-        display_dashboard()
+        display_dashboard(plan)
     elif page == "Recherche de jeunes":
         display_young_people_search(statut_filter)
     elif page == "Offres d'emploi":
-        display_job_offers(sector_filter, contract_filter)
+        display_job_offers(sector_filter, contract_filter, plan)
     elif page == "Matching":
-        display_matching(statut_filter, sector_filter, contract_filter)
+        display_matching(statut_filter, sector_filter, contract_filter, plan)
     elif page == "Suivi des mises en relation":
         display_follow_up()
     
@@ -285,20 +362,20 @@ def main():
     """, unsafe_allow_html=True)
 
 # Fonctions pour afficher chaque page
-def display_dashboard():
+def display_dashboard(plan=default_plan):
     st.markdown('<h1 class="main-header">Tableau de bord</h1>', unsafe_allow_html=True)
     
     # Statistiques rapides
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
         st.markdown('<div class="card">', unsafe_allow_html=True)
-        st.metric("Jeunes en recherche active", len(young_people_df[young_people_df['status'] == 'En recherche active']))
+        st.metric("Jeunes en recherche active", int(filter_rows('young', [('status', ['En recherche active'])]).sum()))
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
         st.markdown('<div class="card">', unsafe_allow_html=True)
-        st.metric("Offres d'emploi actives", len(job_offers_df[job_offers_df['status'] == 'Active']))
+        st.metric("Offres d'emploi actives", int(filter_rows('offers', [('status', ['Active'])]).sum()))
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col3:
@@ -311,6 +388,16 @@ def display_dashboard():
         st.metric("Mises en relation ce mois", 37)  # Valeur simulée
         st.markdown('</div>', unsafe_allow_html=True)
     
+    with col5:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        active_scores = match_scores(
+            young_people_df[filter_rows('young', [('status', ['En recherche active'])])],
+            job_offers_df[filter_rows('offers', [('status', ['Active'])])],
+            plan=plan
+        )
+        st.metric("Matchs à 70 % et plus", int((active_scores >= 70).sum()))
+        st.markdown('</div>', unsafe_allow_html=True)
+    
     # Graphiques
     col1, col2 = st.columns(2)
     
@@ -360,6 +447,10 @@ def display_dashboard():
             """)
             st.markdown("<hr>", unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Empreinte mémoire des tables typées (catégories et petits entiers)
+    with st.expander("Empreinte mémoire des données"):
+        st.dataframe(memory_report, hide_index=True, use_container_width=True)
 
 def display_young_people_search(status_filter):
     st.markdown('<h1 class="main-header">Recherche de jeunes</h1>', unsafe_allow_html=True)
@@ -373,80 +464,54 @@ def display_young_people_search(status_filter):
     with col2:
         qualification_filter = st.multiselect(
             "Qualification",
-            options=sorted(young_people_df['qualification'].unique()),
+            options=list(young_people_df['qualification'].unique().sort_values()),
             default=[]
         )
     
     with col3:
         preferred_sectors_filter = st.multiselect(
             "Secteurs préférés",
-            options=sorted(set([sector for sublist in young_people_df['preferred_sectors'] for sector in sublist])),
+            options=csr_labels(young_people_lists['preferred_sectors']),
             default=[]
         )
     
-    # Application des filtres
-    filtered_young_people = young_people_df.copy()
-    
-    if status_filter:
-        filtered_young_people = filtered_young_people[filtered_young_people['status'].isin(status_filter)]
-    
-    filtered_young_people = filtered_young_people[
-        (filtered_young_people['age'] >= age_range[0]) & 
-        (filtered_young_people['age'] <= age_range[1])
-    ]
+    # Application des filtres (masques en cache combinés sur la table complète)
+    mask = filter_rows('young', [
+        ('status', status_filter),
+        ('age', range(age_range[0], age_range[1] + 1)),
+        ('qualification', qualification_filter),
+        ('preferred_sectors', preferred_sectors_filter),
+    ])
+    positions = np.flatnonzero(mask)
     
-    if qualification_filter:
-        filtered_young_people = filtered_young_people[filtered_young_people['qualification'].isin(qualification_filter)]
-    
-    if preferred_sectors_filter:
-        filtered_young_people = filtered_young_people[
-            filtered_young_people['preferred_sectors'].apply(
-                lambda sectors: any(sector in preferred_sectors_filter for sector in sectors)
-            )
-        ]
-    
-    # Affichage des résultats
-    st.markdown(f"<h2 class='sub-header'>{len(filtered_young_people)} jeunes correspondant aux critères</h2>", unsafe_allow_html=True)
+    # Affichage des résultats : nombre et facettes calculés sur le masque, sans rendre les cartes
+    st.markdown(f"<h2 class='sub-header'>{len(positions)} jeunes correspondant aux critères</h2>", unsafe_allow_html=True)
     
     # Bouton d'exportation
-    if not filtered_young_people.empty:
+    if len(positions):
         col1, col2 = st.columns([4, 1])
+        with col1:
+            st.markdown(facet_caption("Statut", category_counts(young_people_df['status'], mask)))
+            st.markdown(facet_caption("Qualification", category_counts(young_people_df['qualification'], mask)))
         with col2:
             st.download_button(
                 label="Exporter les résultats",
-                data=filtered_young_people.to_csv(index=False).encode('utf-8'),
+                data=young_people_df.iloc[positions].to_csv(index=False).encode('utf-8'),
                 file_name="jeunes_filtres.csv",
                 mime="text/csv"
             )
     
-    # Affichage des profils filtrés
-    for i, (_, young) in enumerate(filtered_young_people.iterrows()):
-        if i % 2 == 0:
-            col1, col2 = st.columns(2)
-        
-        with col1 if i % 2 == 0 else col2:
-            st.markdown('<div class="card">', unsafe_allow_html=True)
-            
-            st.markdown(f"<h3>{young['name']} ({young['age']} ans)</h3>", unsafe_allow_html=True)
-            st.markdown(f"**Qualification:** {young['qualification']}")
-            st.markdown(f"**Expérience:** {young['experience_years']} an(s)")
-            st.markdown(f"**Statut:** {young['status']}")
-            st.markdown(f"**Secteurs préférés:** {', '.join(young['preferred_sectors'])}")
-            st.markdown(f"**Compétences:** {', '.join(young['skills'])}")
-            st.markdown(f"**Contrats recherchés:** {', '.join(young['preferred_contracts'])}")
-            st.markdown(f"**Mobilité:** {young['mobility']} km autour de {young['preferred_location']}")
-            
-            col_a, col_b = st.columns([3, 1])
-            with col_a:
-                st.button(f"Voir le profil complet", key=f"view_young_{young['id']}")
-            with col_b:
-                st.button(f"Contacter", key=f"contact_young_{young['id']}")
-            
-            st.markdown('</div>', unsafe_allow_html=True)
+    # Affichage des profils filtrés (page courante seulement)
+    page, page_size = pagination_controls("young_search", len(positions))
+    page_cache = load_page_cache()
+    young_records = page_cache.page(DATA_VERSION, 'young', young_people_df, positions, page, page_size)
+    st.markdown(card_block(young_cards(young_records), grid=True), unsafe_allow_html=True)
+    
+    page_cache.prefetch(DATA_VERSION, 'young', young_people_df, positions, page, page_size)
 
 # Modification à apporter à la fonction display_job_offers
 
-def display_job_offers(sector_filter, contract_filter):
+def display_job_offers(sector_filter, contract_filter, plan=default_plan):
     st.markdown('<h1 class="main-header">Offres d\'emploi</h1>', unsafe_allow_html=True)
     
     # Initialiser un état pour suivre l'offre sélectionnée pour la proposition de candidats
@@ -473,81 +538,66 @@ def display_job_offers(sector_filter, contract_filter):
     with col3:
         qualification_filter = st.multiselect(
             "Qualification requise",
-            options=sorted(job_offers_df['required_qualification'].unique()),
+            options=list(job_offers_df['required_qualification'].unique().sort_values()),
             default=[]
         )
     
-    # Application des filtres
-    filtered_job_offers = job_offers_df.copy()
-    
-    if status_filter:
-        filtered_job_offers = filtered_job_offers[filtered_job_offers['status'].isin(status_filter)]
-    
-    if sector_filter:
-        filtered_job_offers = filtered_job_offers[filtered_job_offers['sector'].isin(sector_filter)]
-    
-    if contract_filter:
-        filtered_job_offers = filtered_job_offers[filtered_job_offers['contract_type'].isin(contract_filter)]
+    # Application des filtres (masques en cache combinés sur la table complète)
+    mask = filter_rows('offers', [
+        ('status', status_filter),
+        ('sector', sector_filter),
+        ('contract_type', contract_filter),
+        ('location', location_filter),
+        ('required_qualification', qualification_filter),
+    ])
+    positions = np.flatnonzero(mask)
     
-    if location_filter:
-        filtered_job_offers = filtered_job_offers[filtered_job_offers['location'].isin(location_filter)]
-    
-    if qualification_filter:
-        filtered_job_offers = filtered_job_offers[filtered_job_offers['required_qualification'].isin(qualification_filter)]
-    
-    # Affichage des résultats
-    st.markdown(f"<h2 class='sub-header'>{len(filtered_job_offers)} offres correspondant aux critères</h2>", unsafe_allow_html=True)
+    # Affichage des résultats : nombre et facettes calculés sur le masque, sans rendre les cartes
+    st.markdown(f"<h2 class='sub-header'>{len(positions)} offres correspondant aux critères</h2>", unsafe_allow_html=True)
     
     # Bouton d'exportation
-    if not filtered_job_offers.empty:
+    if len(positions):
         col1, col2 = st.columns([4, 1])
+        with col1:
+            st.markdown(facet_caption("Secteur", category_counts(job_offers_df['sector'], mask)))
+            st.markdown(facet_caption("Contrat", category_counts(job_offers_df['contract_type'], mask)))
         with col2:
             st.download_button(
                 label="Exporter les offres",
-                data=filtered_job_offers.to_csv(index=False).encode('utf-8'),
+                data=job_offers_df.iloc[positions].to_csv(index=False).encode('utf-8'),
                 file_name="offres_filtrees.csv",
                 mime="text/csv"
             )
     
-    # Affichage des offres filtrées
-    for i, (_, job) in enumerate(filtered_job_offers.iterrows()):
-        if i % 2 == 0:
-            col1, col2 = st.columns(2)
-        
-        with col1 if i % 2 == 0 else col2:
-            job_id = job['id']  # Récupérer l'ID de l'offre
-            status_color = {
-                'Active': '#c9dfd6',
-                'Pourvu': '#f0f0f0',
-                'En attente': '#f9f9f9'
-            }
-            
-            st.markdown(f"""
-            <div class="card" style="border-left: 5px solid {status_color.get(job['status'], '#ddd')}">
-                <h3>{job['title']} - {job['company_name']}</h3>
-                <p><strong>Secteur:</strong> {job['sector']} | <strong>Contrat:</strong> {job['contract_type']}</p>
-                <p><strong>Qualification requise:</strong> {job['required_qualification']} | <strong>Expérience:</strong> {job['required_experience']} an(s)</p>
-                <p><strong>Localisation:</strong> {job['location']} | <strong>Publication:</strong> {job['publication_date']}</p>
-                <p><strong>Compétences requises:</strong> {', '.join(job['required_skills'])}</p>
-                <p><strong>Statut:</strong> {job['status']} | <strong>Candidatures:</strong> {job['applications']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Utiliser des boutons Streamlit réels pour les actions
-            col_a, col_b = st.columns(2)
-            with col_a:
-                st.button("Voir l'offre complète", key=f"view_offer_{job_id}")
-            with col_b:
-                # Utiliser un unique identifiant pour chaque bouton basé sur l'ID de l'offre
-                if st.button("Proposer des candidats", key=f"propose_{job_id}"):
-                    st.session_state.selected_job_for_candidates = job_id
+    # Affichage des offres filtrées (page courante seulement)
+    page, page_size = pagination_controls("job_offers", len(positions))
+    page_cache = load_page_cache()
+    offer_records = page_cache.page(DATA_VERSION, 'offers', job_offers_df, positions, page, page_size)
+    st.markdown(card_block(offer_cards(offer_records), grid=True), unsafe_allow_html=True)
+    
+    # Proposition de candidats pour une offre de la page
+    if offer_records:
+        col_a, col_b = st.columns([3, 1])
+        with col_a:
+            proposed_job = st.selectbox(
+                "Proposer des candidats pour",
+                options=[record['id'] for record in offer_records],
+                format_func=lambda x: entity_label(entity_store, 'offers', x),
+                key="propose_job"
+            )
+        with col_b:
+            if st.button("Proposer des candidats", key="propose_candidates"):
+                st.session_state.selected_job_for_candidates = proposed_job
+    
+    page_cache.prefetch(DATA_VERSION, 'offers', job_offers_df, positions, page, page_size)
 
     # Afficher les candidats correspondants si une offre est sélectionnée
     if st.session_state.selected_job_for_candidates:
         # Récupérer les détails de l'offre sélectionnée
-        selected_job = job_offers_df[job_offers_df['id'] == st.session_state.selected_job_for_candidates]
+        selected_position = entity_position(entity_store, 'offers', st.session_state.selected_job_for_candidates)
         
-        if not selected_job.empty:
+        if selected_position is not None:
+            selected_job = job_offers_df.iloc[[selected_position]]
             job_offer = selected_job.iloc[0]
             
             # Délimiteur visuel
@@ -562,47 +612,20 @@ def display_job_offers(sector_filter, contract_filter):
                 st.rerun()
             
             # Trouver des candidats correspondants
-            active_young_people = young_people_df[young_people_df['status'] == 'En recherche active'].copy()
+            active_young_people = young_people_df[filter_rows('young', [('status', ['En recherche active'])])]
             
-            # Calcul des scores de matching
-            match_results = []
-            for _, young in active_young_people.iterrows():
-                score = calculate_match_score(young, job_offer)
-                match_results.append({
-                    'young_id': young['id'],
-                    'name': young['name'],
-                    'age': young['age'],
-                    'qualification': young['qualification'],
-                    'experience_years': young['experience_years'],
-                    'skills': young['skills'],
-                    'preferred_location': young['preferred_location'],
-                    'match_score': score
-                })
+            # Calcul des scores de matching (tous les candidats en une seule opération) et sélection du top 10
+            scores = match_scores(active_young_people, selected_job, plan=plan)[:, 0]
+            match_df = top_matches(active_young_people, scores, YOUNG_MATCH_COLUMNS, 'young_id', 10)
+            match_df = add_score_components(match_df, match_df, selected_job, plan=plan)
             
-            if match_results:
-                match_df = pd.DataFrame(match_results).sort_values('match_score', ascending=False)
-                
-                # Affichage des candidats correspondants
-                for _, match in match_df.head(5).iterrows():
-                    score = match['match_score']
-                    score_class = "match-high" if score >= 70 else "match-medium" if score >= 40 else "match-low"
-                    
-                    st.markdown(f"""
-                    <div class="card" style="display: flex; align-items: center;">
-                        <div style="flex: 0.2;">
-                            <div class="match-score {score_class}">{score}%</div>
-                        </div>
-                        <div style="flex: 0.8; padding-left: 15px;">
-                            <h3>{match['name']} ({match['age']} ans)</h3>
-                            <p><strong>Qualification:</strong> {match['qualification']} | <strong>Expérience:</strong> {match['experience_years']} an(s)</p>
-                            <p><strong>Compétences:</strong> {', '.join(match['skills'][:3])}...</p>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
+            if not match_df.empty:
+                # Affichage des candidats correspondants (un seul bloc HTML)
+                st.markdown(card_block(young_match_cards(match_df.head(5).to_dict('records'), with_actions=False, weights=plan['component_weights'])), unsafe_allow_html=True)
                 
                 # Graphique des meilleurs candidats
                 st.markdown('<h3>Top 10 des candidats</h3>', unsafe_allow_html=True)
-                top_candidates = match_df.head(10).sort_values('match_score')
+                top_candidates = match_df.sort_values('match_score')
                 fig = px.bar(
                     top_candidates, 
                     x='match_score', 
@@ -617,18 +640,47 @@ def display_job_offers(sector_filter, contract_filter):
             else:
                 st.info("Aucun candidat ne correspond aux critères de l'offre.")
 
-def display_matching(status_filter, sector_filter, contract_filter):
+def display_matching(status_filter, sector_filter, contract_filter, plan=default_plan):
     st.markdown('<h1 class="main-header">Matching Jeunes - Offres</h1>', unsafe_allow_html=True)
     
+    # Score minimum : les couples qui ne peuvent pas l'atteindre ne sont pas calculés
+    min_score = st.slider("Score de matching minimum (%)", min_value=0, max_value=100, value=30, step=5)
+    
+    # Mode de comparaison : libellés identiques ou proximité des libellés (TF-IDF sur compétences, intitulés et secteurs)
+    semantic = st.radio(
+        "Comparaison des compétences",
+        ["Libellés identiques", "Proximité des libellés (TF-IDF)"],
+        horizontal=True
+    ) != "Libellés identiques"
+    pruning_score = blended_min_exact_score(min_score) if semantic else min_score
+    
+    # Localisation : même commune (5 points), ou distance à vol d'oiseau dans le rayon de mobilité du jeune
+    mobility_mode = st.radio(
+        "Prise en compte de la localisation",
+        ["Même commune", "Rayon de mobilité (bonus)", "Rayon de mobilité (obligatoire)"],
+        horizontal=True
+    )
+    
+    # Contraintes strictes : les couples qui ne les respectent pas sont écartés avant le calcul des scores
+    constraints = st.multiselect(
+        "Contraintes strictes",
+        options=list(HARD_CONSTRAINTS),
+        format_func=HARD_CONSTRAINTS.get,
+        default=[]
+    )
+    constraint_index = load_constraint_index(plan['hash'], plan)
+    
     # Interface de sélection d'un jeune ou d'une offre
-    tabs = st.tabs(["Trouver des offres pour un jeune", "Trouver des candidats pour une offre"])
+    tabs = st.tabs(["Trouver des offres pour un jeune", "Trouver des candidats pour une offre", "Affectation de la cohorte"])
+    
+    # Onglet 3 (rempli en premier : les onglets 1 et 2 peuvent s'arrêter plus tôt)
+    with tabs[2]:
+        display_cohort_assignment(status_filter, sector_filter, contract_filter, min_score, mobility_mode, plan, constraints)
     
     # Onglet 1: Trouver des offres pour un jeune
     with tabs[0]:
         # Filtre des jeunes
-        filtered_young_people = young_people_df.copy()
-        if status_filter:
-            filtered_young_people = filtered_young_people[filtered_young_people['status'].isin(status_filter)]
+        filtered_young_people = young_people_df[filter_rows('young', [('status', status_filter)])]
         
         if filtered_young_people.empty:
             st.warning("Aucun jeune ne correspond aux filtres sélectionnés. Veuillez modifier vos critères de recherche.")
@@ -638,10 +690,11 @@ def display_matching(status_filter, sector_filter, contract_filter):
         selected_young = st.selectbox(
             "Sélectionner un jeune",
             options=filtered_young_people['id'].tolist(),
-            format_func=lambda x: f"{filtered_young_people[filtered_young_people['id'] == x]['name'].iloc[0]} ({x})"
+            format_func=lambda x: entity_label(entity_store, 'young', x)
         )
         
-        young_person = filtered_young_people[filtered_young_people['id'] == selected_young].iloc[0]
+        young_position = entity_position(entity_store, 'young', selected_young)
+        young_person = young_people_df.iloc[young_position]
         
         # Affichage des détails du jeune sélectionné
         col1, col2 = st.columns([1, 3])
@@ -662,82 +715,49 @@ def display_matching(status_filter, sector_filter, contract_filter):
             st.markdown('</div>', unsafe_allow_html=True)
         
         # Trouver des offres correspondantes
-        active_offers = job_offers_df[job_offers_df['status'] == 'Active'].copy()
+        active_offers = filter_rows('offers', [('status', ['Active']), ('sector', sector_filter), ('contract_type', contract_filter)])
         
-        if sector_filter:
-            active_offers = active_offers[active_offers['sector'].isin(sector_filter)]
+        # Seules les offres partageant une compétence, un secteur ou un contrat avec le jeune peuvent atteindre le score minimum
+        reachable_offers = candidate_offers(young_people_encoded, young_position, job_offers_index, pruning_score, plan)
+        if constraints:
+            reachable_offers = np.intersect1d(reachable_offers, eligible_offers(
+                young_people_encoded, young_position, job_offers_encoded, constraint_index, constraints
+            ))
+        active_offers = job_offers_df.iloc[np.intersect1d(np.flatnonzero(active_offers), reachable_offers)]
         
-        if contract_filter:
-            active_offers = active_offers[active_offers['contract_type'].isin(contract_filter)]
+        # Calcul des scores de matching (toutes les offres candidates en une seule opération) et sélection du top 5
+        scores = match_scores(young_person.to_frame().T, active_offers, semantic, mobility_mode, plan)[0]
+        match_df = top_matches(active_offers, scores, OFFER_MATCH_COLUMNS, 'offer_id', 5, min_score)
+        match_df = add_score_components(match_df, young_person.to_frame().T, match_df, mobility_mode, plan)
         
-        # Calcul des scores de matching
-        match_results = []
-        for _, offer in active_offers.iterrows():
-            score = calculate_match_score(young_person, offer)
-            match_results.append({
-                'offer_id': offer['id'],
-                'company_name': offer['company_name'],
-                'title': offer['title'],
-                'sector': offer['sector'],
-                'contract_type': offer['contract_type'],
-                'location': offer['location'],
-                'match_score': score
-            })
-        
-        # Vérifier si match_results contient des données avant de créer le DataFrame
-        if match_results:
-            match_df = pd.DataFrame(match_results).sort_values('match_score', ascending=False)
-            
+        # Vérifier si des offres atteignent le score minimum
+        if not match_df.empty:
             # Affichage des résultats
-            if not match_df.empty:
-                st.markdown('<h2 class="sub-header">Offres correspondantes</h2>', unsafe_allow_html=True)
-                
-                for _, match in match_df.head(5).iterrows():
-                    score = match['match_score']
-                    score_class = "match-high" if score >= 70 else "match-medium" if score >= 40 else "match-low"
-                    
-                    st.markdown(f"""
-                    <div class="card" style="display: flex; align-items: center;">
-                        <div style="flex: 0.2;">
-                            <div class="match-score {score_class}">{score}%</div>
-                        </div>
-                        <div style="flex: 0.8; padding-left: 15px;">
-                            <h3>{match['title']} - {match['company_name']}</h3>
-                            <p><strong>Secteur:</strong> {match['sector']} | <strong>Contrat:</strong> {match['contract_type']}</p>
-                            <p><strong>Localisation:</strong> {match['location']}</p>
-                            <div style="display: flex; justify-content: flex-end; margin-top: 10px;">
-                                <button style="background-color: #2a6d81; color: white; border: none; padding: 5px 10px; border-radius: 5px; cursor: pointer; margin-right: 10px;">Voir l'offre</button>
-                                <button style="background-color: #90c5b5; color: white; border: none; padding: 5px 10px; border-radius: 5px; cursor: pointer;">Proposer ce candidat</button>
-                            </div>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                # Graphique de répartition des scores
-                st.markdown('<h3>Répartition des scores de matching</h3>', unsafe_allow_html=True)
-                fig = px.histogram(match_df, x='match_score', nbins=10, color_discrete_sequence=['#2a6d81'])
-                fig.update_layout(
-                    xaxis_title="Score de matching (%)",
-                    yaxis_title="Nombre d'offres",
-                    bargap=0.1
-                )
-                st.plotly_chart(fig, use_container_width=True, key="histogram_offers")
+            st.markdown('<h2 class="sub-header">Offres correspondantes</h2>', unsafe_allow_html=True)
+            
+            st.markdown(card_block(offer_match_cards(match_df.to_dict('records'), plan['component_weights'])), unsafe_allow_html=True)
+            display_score_details(match_df, 'title', "score_details_offers", semantic, plan)
+            
+            # Graphique de répartition des scores (comptage par tranches sur toutes les offres retenues)
+            st.markdown('<h3>Répartition des scores de matching</h3>', unsafe_allow_html=True)
+            score_counts = score_histogram(scores[scores >= min_score])
+            fig = px.bar(score_counts, x='Score de matching (%)', y='Nombre', color_discrete_sequence=['#2a6d81'])
+            fig.update_layout(
+                xaxis_title="Score de matching (%)",
+                yaxis_title="Nombre d'offres",
+                bargap=0.1
+            )
+            st.plotly_chart(fig, use_container_width=True, key="histogram_offers")
         else:
             st.info("Aucune offre ne correspond aux critères sélectionnés.")
     
     # Onglet 2: Trouver des candidats pour une offre
     with tabs[1]:
         # Filtre des offres
-        filtered_job_offers = job_offers_df.copy()
-        
-        if 'Active' in filtered_job_offers['status'].unique():
-            filtered_job_offers = filtered_job_offers[filtered_job_offers['status'] == 'Active']
-        
-        if sector_filter:
-            filtered_job_offers = filtered_job_offers[filtered_job_offers['sector'].isin(sector_filter)]
-        
-        if contract_filter:
-            filtered_job_offers = filtered_job_offers[filtered_job_offers['contract_type'].isin(contract_filter)]
+        active_statuses = ['Active'] if filter_rows('offers', [('status', ['Active'])]).any() else []
+        filtered_job_offers = job_offers_df[filter_rows('offers', [
+            ('status', active_statuses), ('sector', sector_filter), ('contract_type', contract_filter)
+        ])]
         
         if filtered_job_offers.empty:
             st.warning("Aucune offre active ne correspond aux filtres sélectionnés. Veuillez modifier vos critères de recherche.")
@@ -747,12 +767,13 @@ def display_matching(status_filter, sector_filter, contract_filter):
         selected_offer = st.selectbox(
             "Sélectionner une offre",
             options=filtered_job_offers['id'].tolist(),
-            format_func=lambda x: f"{filtered_job_offers[filtered_job_offers['id'] == x]['title'].iloc[0]} - {filtered_job_offers[filtered_job_offers['id'] == x]['company_name'].iloc[0]} ({x})"
+            format_func=lambda x: entity_label(entity_store, 'offers', x)
         )
         
         # Vérifier si l'offre sélectionnée existe encore dans les données filtrées
-        if selected_offer in filtered_job_offers['id'].values:
-            job_offer = filtered_job_offers[filtered_job_offers['id'] == selected_offer].iloc[0]
+        offer_position = entity_position(entity_store, 'offers', selected_offer)
+        if offer_position is not None and job_offers_df.index[offer_position] in filtered_job_offers.index:
+            job_offer = job_offers_df.iloc[offer_position]
             
             # Affichage des détails de l'offre sélectionnée
             st.markdown('<div class="card">', unsafe_allow_html=True)
@@ -764,126 +785,119 @@ def display_matching(status_filter, sector_filter, contract_filter):
             st.markdown('</div>', unsafe_allow_html=True)
             
             # Trouver des candidats correspondants
-            active_young_people = young_people_df[young_people_df['status'] == 'En recherche active'].copy()
+            active_young_people = filter_rows('young', [('status', ['En recherche active']), ('status', status_filter)])
             
-            if status_filter:
-                active_young_people = active_young_people[active_young_people['status'].isin(status_filter)]
+            # Seuls les jeunes partageant une compétence, un secteur ou un contrat avec l'offre peuvent atteindre le score minimum
+            reachable_young_people = candidate_young_people(job_offers_encoded, offer_position, young_people_index, pruning_score, plan)
+            if constraints:
+                reachable_young_people = np.intersect1d(reachable_young_people, eligible_young_people(
+                    job_offers_encoded, offer_position, young_people_encoded, constraint_index, constraints
+                ))
+            active_young_people = young_people_df.iloc[np.intersect1d(np.flatnonzero(active_young_people), reachable_young_people)]
             
-            # Calcul des scores de matching
-            match_results = []
-            for _, young in active_young_people.iterrows():
-                score = calculate_match_score(young, job_offer)
-                match_results.append({
-                    'young_id': young['id'],
-                    'name': young['name'],
-                    'age': young['age'],
-                    'qualification': young['qualification'],
-                    'experience_years': young['experience_years'],
-                    'skills': young['skills'],
-                    'preferred_location': young['preferred_location'],
-                    'match_score': score
-                })
+            # Calcul des scores de matching (tous les candidats retenus en une seule opération) et sélection du top 10
+            scores = match_scores(active_young_people, job_offer.to_frame().T, semantic, mobility_mode, plan)[:, 0]
+            match_df = top_matches(active_young_people, scores, YOUNG_MATCH_COLUMNS, 'young_id', 10, min_score)
+            match_df = add_score_components(match_df, match_df, job_offer.to_frame().T, mobility_mode, plan)
             
-            # Vérifier si match_results contient des données avant de créer le DataFrame
-            if match_results:
-                match_df = pd.DataFrame(match_results).sort_values('match_score', ascending=False)
-                
+            # Vérifier si des candidats atteignent le score minimum
+            if not match_df.empty:
                 # Affichage des résultats
-                if not match_df.empty:
-                    st.markdown('<h2 class="sub-header">Candidats correspondants</h2>', unsafe_allow_html=True)
-                    
-                    for _, match in match_df.head(5).iterrows():
-                        score = match['match_score']
-                        score_class = "match-high" if score >= 70 else "match-medium" if score >= 40 else "match-low"
-                        
-                        st.markdown(f"""
-                        <div class="card" style="display: flex; align-items: center;">
-                            <div style="flex: 0.2;">
-                                <div class="match-score {score_class}">{score}%</div>
-                            </div>
-                            <div style="flex: 0.8; padding-left: 15px;">
-                                <h3>{match['name']} ({match['age']} ans)</h3>
-                                <p><strong>Qualification:</strong> {match['qualification']} | <strong>Expérience:</strong> {match['experience_years']} an(s)</p>
-                                <p><strong>Compétences:</strong> {', '.join(match['skills'][:3])}...</p>
-                                <div style="display: flex; justify-content: flex-end; margin-top: 10px;">
-                                    <button style="background-color: #2a6d81; color: white; border: none; padding: 5px 10px; border-radius: 5px; cursor: pointer; margin-right: 10px;">Voir le profil</button>
-                                    <button style="background-color: #90c5b5; color: white; border: none; padding: 5px 10px; border-radius: 5px; cursor: pointer;">Proposer cette offre</button>
-                                </div>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    # Graphique des meilleurs candidats
-                    top_candidates = match_df.head(10).sort_values('match_score')
-                    if not top_candidates.empty:
-                        st.markdown('<h3>Top 10 des candidats</h3>', unsafe_allow_html=True)
-                        fig = px.bar(
-                            top_candidates, 
-                            x='match_score', 
-                            y='name',
-                            orientation='h',
-                            color='match_score',
-                            color_continuous_scale='Teal',
-                            labels={'match_score': 'Score de matching (%)', 'name': 'Candidat'}
-                        )
-                        fig.update_layout(height=400)
-                        st.plotly_chart(fig, use_container_width=True, key="bar_candidates")
+                st.markdown('<h2 class="sub-header">Candidats correspondants</h2>', unsafe_allow_html=True)
+                
+                st.markdown(card_block(young_match_cards(match_df.head(5).to_dict('records'), weights=plan['component_weights'])), unsafe_allow_html=True)
+                display_score_details(match_df, 'name', "score_details_candidates", semantic, plan)
+                
+                # Graphique des meilleurs candidats
+                top_candidates = match_df.sort_values('match_score')
+                if not top_candidates.empty:
+                    st.markdown('<h3>Top 10 des candidats</h3>', unsafe_allow_html=True)
+                    fig = px.bar(
+                        top_candidates, 
+                        x='match_score', 
+                        y='name',
+                        orientation='h',
+                        color='match_score',
+                        color_continuous_scale='Teal',
+                        labels={'match_score': 'Score de matching (%)', 'name': 'Candidat'}
+                    )
+                    fig.update_layout(height=400)
+                    st.plotly_chart(fig, use_container_width=True, key="bar_candidates")
             else:
                 st.info("Aucun candidat ne correspond aux critères de l'offre.")
         else:
             st.error("L'offre sélectionnée n'est plus disponible. Veuillez en choisir une autre.")
 
+# Affectation globale : chaque jeune reçoit au plus une offre, chaque offre au plus "capacité" jeunes,
+# sans couple jeune / offre qui se préféreraient mutuellement à leur affectation (mariages stables)
+def display_cohort_assignment(status_filter, sector_filter, contract_filter, min_score, mobility_mode, plan=default_plan,
+                              constraints=()):
+    st.markdown('<h2 class="sub-header">Affectation de la cohorte</h2>', unsafe_allow_html=True)
+    st.caption("Scores exacts (libellés identiques) ; les rayons de mobilité sont pris en compte comme bonus.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        capacity = st.number_input("Capacité par offre (jeunes proposés)", min_value=1, max_value=20, value=1)
+    with col2:
+        proposal_limit = st.number_input("Nombre maximum d'offres envisagées par jeune", min_value=1, max_value=50, value=10)
+    
+    young_positions = np.flatnonzero(filter_rows('young', [('status', ['En recherche active']), ('status', status_filter)]))
+    offer_positions = np.flatnonzero(filter_rows('offers', [('status', ['Active']), ('sector', sector_filter), ('contract_type', contract_filter)]))
+    st.markdown(f"**Cohorte :** {len(young_positions)} jeunes en recherche active, {len(offer_positions)} offres actives")
+    
+    # Une affectation par jeu de paramètres (données, profil, filtres, score minimum, localisation, contraintes,
+    # capacité, nombre d'offres envisagées) : revenir à des paramètres déjà calculés ne recalcule rien, et un
+    # résultat n'est jamais affiché ni envoyé pour d'autres paramètres que les siens
+    inputs = (
+        DATA_VERSION, plan['hash'], tuple(status_filter), tuple(sector_filter), tuple(contract_filter),
+        min_score, mobility_mode, tuple(sorted(constraints)), capacity, proposal_limit
+    )
+    assignments = st.session_state.setdefault('cohort_assignments', {})
+    
+    if st.button("Calculer l'affectation", key="run_cohort_assignment"):
+        assignment = assign_cohort(
+            young_people_encoded, job_offers_encoded, young_positions, offer_positions,
+            capacity=capacity, proposal_limit=proposal_limit, min_score=min_score,
+            distances=location_distances if mobility_mode != "Même commune" else None, plan=plan,
+            pair_filter=partial(constraint_mask, constraints=constraints, plan=plan) if constraints else None
+        )
+        assignments[inputs] = assignment_frame(assignment, young_people_df, job_offers_df)
+    
+    assignment_df = assignments.get(inputs)
+    if assignment_df is None:
+        if assignments:
+            st.info("Les paramètres ont changé depuis le dernier calcul : relancez l'affectation avant de l'envoyer vers le suivi.")
+        return
+    if assignment_df.empty:
+        st.info("Aucun couple jeune / offre n'atteint le score minimum.")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Jeunes affectés", len(assignment_df))
+    col2.metric("Offres pourvues", assignment_df['offer_id'].nunique())
+    col3.metric("Score moyen", f"{assignment_df['match_score'].mean():.0f} %")
+    st.dataframe(
+        assignment_df.rename(columns={
+            'young_name': 'Jeune', 'offer_title': 'Offre', 'company_name': 'Entreprise',
+            'match_score': 'Score (%)', 'choice': 'Rang du choix'
+        }).drop(columns=['young_id', 'offer_id']),
+        hide_index=True, use_container_width=True
+    )
+    
+    # Les affectations deviennent des mises en relation "Proposé" dans le suivi
+    if st.button("Envoyer vers le suivi des mises en relation", key="send_cohort_assignment"):
+        match_ids = load_follow_up_store().propose_many(
+            assignment_df.to_dict('records'), datetime.now().strftime('%Y-%m-%d'), notes="Affectation de la cohorte"
+        )
+        assignments.pop(inputs)
+        st.success(f"{len(match_ids)} mises en relation ajoutées au suivi.")
+
 def display_follow_up():
     st.markdown('<h1 class="main-header">Suivi des mises en relation</h1>', unsafe_allow_html=True)
     
-    # Création de données fictives pour les mises en relation
-    @st.cache_data
-    def generate_matching_data():
-        matches = []
-        statuses = ['Proposé', 'Entretien programmé', 'Entretien réalisé', 'Embauche', 'Refus employeur', 'Refus candidat']
-        
-        # Vérifier que nous avons des données pour générer des matchs
-        if young_people_df.empty or job_offers_df.empty:
-            return pd.DataFrame()  # Retourner un DataFrame vide
-        
-        for i in range(20):
-            # Utiliser random.randint pour éviter les index out of bounds
-            if len(young_people_df) > 0:
-                young_idx = random.randint(0, len(young_people_df) - 1)
-                young_id = young_people_df.iloc[young_idx]['id']
-                young_name = young_people_df.iloc[young_idx]['name']
-            else:
-                continue  # S'il n'y a pas de jeunes, on passe à l'itération suivante
-            
-            if len(job_offers_df) > 0:
-                job_idx = random.randint(0, len(job_offers_df) - 1)
-                offer_id = job_offers_df.iloc[job_idx]['id']
-                offer_title = job_offers_df.iloc[job_idx]['title']
-                company_name = job_offers_df.iloc[job_idx]['company_name']
-            else:
-                continue  # S'il n'y a pas d'offres, on passe à l'itération suivante
-            
-            match_date = (datetime.now() - timedelta(days=random.randint(1, 60))).strftime('%Y-%m-%d')
-            status = random.choice(statuses)
-            last_update = (datetime.now() - timedelta(days=random.randint(0, 30))).strftime('%Y-%m-%d')
-            
-            matches.append({
-                'id': f'M{i+1:03d}',
-                'young_id': young_id,
-                'young_name': young_name,
-                'offer_id': offer_id,
-                'offer_title': offer_title,
-                'company_name': company_name,
-                'match_date': match_date,
-                'status': status,
-                'last_update': last_update,
-                'notes': f"Note de suivi pour la mise en relation {i+1}" if random.random() > 0.5 else ""
-            })
-        
-        return pd.DataFrame(matches)
-    
-    # Générer les données de suivi
-    matches_df = generate_matching_data()
+    # Suivi persistant : journal des changements de statut et table de l'état courant indexée
+    follow_up_store = load_follow_up_store()
+    matches_df = follow_up_store.frame()
     
     # Vérifier si nous avons des données à afficher
     if matches_df.empty:
@@ -896,7 +910,7 @@ def display_follow_up():
     with col1:
         status_filter = st.multiselect(
             "Statut de la mise en relation",
-            options=sorted(matches_df['status'].unique()),
+            options=[status for status, count in follow_up_store.status_counts().items() if count],
             default=[]
         )
     
@@ -913,25 +927,12 @@ def display_follow_up():
     with col3:
         search_term = st.text_input("Rechercher (candidat ou entreprise)", "")
     
-    # Application des filtres
-    filtered_matches = matches_df.copy()
-    
-    if status_filter:
-        filtered_matches = filtered_matches[filtered_matches['status'].isin(status_filter)]
-    
-    if len(date_range) == 2:
-        start_date, end_date = date_range
-        filtered_matches = filtered_matches[
-            (pd.to_datetime(filtered_matches['match_date']) >= pd.to_datetime(start_date)) &
-            (pd.to_datetime(filtered_matches['match_date']) <= pd.to_datetime(end_date))
-        ]
-    
-    if search_term:
-        filtered_matches = filtered_matches[
-            (filtered_matches['young_name'].str.contains(search_term, case=False)) |
-            (filtered_matches['company_name'].str.contains(search_term, case=False)) |
-            (filtered_matches['offer_title'].str.contains(search_term, case=False))
-        ]
+    # Application des filtres (statut, période et recherche sans accents ni casse : intersection des index du suivi)
+    start_date, end_date = (date.strftime('%Y-%m-%d') for date in date_range) if len(date_range) == 2 else (None, None)
+    positions = follow_up_store.query(
+        statuses=status_filter or None, start_date=start_date, end_date=end_date, search=search_term.strip() or None
+    )
+    filtered_matches = matches_df.iloc[positions]
     
     # Vérifier si nous avons des données après filtrage
     if filtered_matches.empty:
@@ -941,10 +942,11 @@ def display_follow_up():
     # Affichage des statistiques
     col1, col2, col3, col4 = st.columns(4)
     
+    status_counts = follow_up_store.status_counts(filtered_matches.index.to_numpy())
     total_matches = len(filtered_matches)
-    successful_matches = len(filtered_matches[filtered_matches['status'] == 'Embauche'])
-    ongoing_matches = len(filtered_matches[filtered_matches['status'].isin(['Proposé', 'Entretien programmé', 'Entretien réalisé'])])
-    rejected_matches = len(filtered_matches[filtered_matches['status'].isin(['Refus employeur', 'Refus candidat'])])
+    successful_matches = status_counts['Embauche']
+    ongoing_matches = sum(status_counts[status] for status in ONGOING_STATUSES)
+    rejected_matches = sum(status_counts[status] for status in REJECTED_STATUSES)
     
     with col1:
         st.markdown('<div class="card">', unsafe_allow_html=True)
@@ -970,8 +972,8 @@ def display_follow_up():
     col1, col2 = st.columns(2)
     
     with col1:
-        status_counts = filtered_matches['status'].value_counts().reset_index()
-        status_counts.columns = ['Statut', 'Nombre']
+        status_counts = pd.DataFrame({'Statut': list(status_counts), 'Nombre': list(status_counts.values())})
+        status_counts = status_counts[status_counts['Nombre'] > 0]
         if not status_counts.empty:
             fig = px.pie(status_counts, values='Nombre', names='Statut', hole=0.4,
                         color_discrete_sequence=px.colors.sequential.Teal)
@@ -979,16 +981,35 @@ def display_follow_up():
             st.plotly_chart(fig, use_container_width=True, key="pie_status")
     
     with col2:
-        # Convertir les dates en datetime pour le traitement
-        filtered_matches['match_date'] = pd.to_datetime(filtered_matches['match_date'])
-        matches_by_month = filtered_matches.groupby(filtered_matches['match_date'].dt.strftime('%Y-%m')).size().reset_index()
-        matches_by_month.columns = ['Mois', 'Nombre']
+        # Compteurs mensuels du suivi, ou décompte des mois des seules lignes filtrées
+        monthly_counts = follow_up_store.monthly_counts(
+            None if len(filtered_matches) == len(follow_up_store) else filtered_matches.index.to_numpy()
+        )
+        matches_by_month = pd.DataFrame({'Mois': list(monthly_counts), 'Nombre': list(monthly_counts.values())})
         if not matches_by_month.empty:
             fig = px.line(matches_by_month, x='Mois', y='Nombre', markers=True,
                         color_discrete_sequence=['#2a6d81'])
             fig.update_layout(title="Évolution mensuelle des mises en relation")
             st.plotly_chart(fig, use_container_width=True, key="line_monthly")
     
+    # Changement de statut (ajouté au journal, l'état courant et les index sont mis à jour)
+    with st.expander("Mettre à jour le statut d'une mise en relation"):
+        open_matches = filtered_matches[filtered_matches['status'].isin(ONGOING_STATUSES)]
+        if open_matches.empty:
+            st.info("Aucune mise en relation en cours parmi les résultats filtrés.")
+        else:
+            match_id = st.selectbox(
+                "Mise en relation",
+                options=open_matches['id'].tolist(),
+                format_func=lambda x: f"{x} - {matches_df['young_name'].iat[follow_up_store.positions[x]]} → {matches_df['offer_title'].iat[follow_up_store.positions[x]]}"
+            )
+            current_status = matches_df['status'].iat[follow_up_store.positions[match_id]]
+            new_status = st.selectbox("Nouveau statut", options=TRANSITIONS[current_status])
+            note = st.text_input("Note", "")
+            if st.button("Enregistrer", key="save_follow_up"):
+                follow_up_store.update_status(match_id, new_status, datetime.now().strftime('%Y-%m-%d'), note)
+                st.rerun()
+    
     # Tableau des mises en relation
     st.markdown('<h2 class="sub-header">Liste des mises en relation</h2>', unsafe_allow_html=True)
     
@@ -1002,35 +1023,8 @@ def display_follow_up():
             mime="text/csv"
         )
     
-    # Tableau interactif
-    for _, match in filtered_matches.iterrows():
-        status_color = {
-            'Proposé': '#f0f7f4',
-            'Entretien programmé': '#c9dfd6',
-            'Entretien réalisé': '#90c5b5',
-            'Embauche': '#2a6d81',
-            'Refus employeur': '#f7e4e4',
-            'Refus candidat': '#f7e4e4'
-        }
-        
-        st.markdown(f"""
-        <div class="card" style="border-left: 5px solid {status_color.get(match['status'], '#ddd')};">
-            <div style="display: flex; justify-content: space-between;">
-                <div>
-                    <h3>{match['young_name']} → {match['offer_title']} ({match['company_name']})</h3>
-                </div>
-                <div>
-                    <span style="background-color: {status_color.get(match['status'], '#ddd')}; padding: 5px 10px; border-radius: 20px; font-size: 0.8rem;">{match['status']}</span>
-                </div>
-            </div>
-            <p><strong>Date de mise en relation:</strong> {match['match_date']} | <strong>Dernière mise à jour:</strong> {match['last_update']}</p>
-            <p><strong>Notes:</strong> {match['notes'] if match['notes'] else 'Aucune note'}</p>
-            <div style="display: flex; justify-content: flex-end; margin-top: 10px;">
-                <button style="background-color: #2a6d81; color: white; border: none; padding: 5px 10px; border-radius: 5px; cursor: pointer; margin-right: 10px;">Mettre à jour le statut</button>
-                <button style="background-color: #90c5b5; color: white; border: none; padding: 5px 10px; border-radius: 5px; cursor: pointer;">Ajouter une note</button>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    # Tableau interactif (toutes les cartes en un seul bloc HTML)
+    st.markdown(card_block(follow_up_cards(filtered_matches.to_dict('records'))), unsafe_allow_html=True)
 
 # Lancement de l'application
 if __name__ == "__main__":
@@ -0,0 +1,178 @@
+# Benchmarks du pipeline de matching à plusieurs échelles (10², 10⁴, 10⁶ lignes par défaut)
+# Chaque étape (encodage, score, filtrage, tri, top-k) est chronométrée séparément sur des données
+# synthétiques reproductibles ; le pic mémoire du top-k par tuiles est mesuré à part (tracemalloc).
+# Les résultats sont enregistrés en JSON avec la description de la machine ;
+# avec --baseline, le script échoue (code de sortie 1) si une mesure régresse au-delà du seuil.
+#
+# Utilisation : python apps/benchmark_matching.py --output benchmark.json --baseline benchmark_reference.json
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from synthetic_data import generate_synthetic_data, DEFAULT_SEED
+from typed_frames import apply_schema, category_mask, to_csr, csr_any_of, JOB_OFFERS_SCHEMA, YOUNG_PEOPLE_SCHEMA
+from matching_engine import (
+    build_vocabularies, encode_young_people, encode_job_offers, take_rows, score_encoded, top_k, blocked_top_k
+)
+
+DEFAULT_SCALES = [100, 10_000, 1_000_000]
+DEFAULT_REPEATS = 5
+DEFAULT_THRESHOLD = 0.25
+# Top-k par tuiles : cohorte de jeunes bornée face à toutes les offres, budget mémoire par appel
+BLOCKED_COHORT = 100
+BLOCKED_MEMORY_BUDGET_MB = 64
+
+
+def machine_info():
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+# Meilleur temps sur plusieurs répétitions (en secondes)
+def best_time(function, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+# Filtres de la page "Recherche de jeunes"
+def filter_young_people(young_people_df):
+    filtered = young_people_df[young_people_df['status'].isin(['En recherche active'])]
+    filtered = filtered[(filtered['age'] >= 18) & (filtered['age'] <= 26)]
+    filtered = filtered[filtered['qualification'].isin(['Bac', 'Bac+2'])]
+    return filtered[filtered['preferred_sectors'].apply(lambda sectors: any(sector in ['Commerce', 'Santé'] for sector in sectors))]
+
+
+# Filtres de la page "Offres d'emploi"
+def filter_job_offers(job_offers_df):
+    filtered = job_offers_df[job_offers_df['status'].isin(['Active'])]
+    filtered = filtered[filtered['sector'].isin(['Commerce', 'Santé', 'Logistique'])]
+    filtered = filtered[filtered['contract_type'].isin(['CDI', 'Alternance'])]
+    return filtered[filtered['location'].isin(['Chartres Centre', 'Lucé'])]
+
+
+# Mêmes filtres sur les tables typées (masques calculés sur les codes des catégories et les secteurs en CSR)
+def filter_typed_young_people(young_people_df, preferred_sectors):
+    mask = category_mask(young_people_df['status'], ['En recherche active'])
+    mask &= (young_people_df['age'] >= 18).to_numpy() & (young_people_df['age'] <= 26).to_numpy()
+    mask &= category_mask(young_people_df['qualification'], ['Bac', 'Bac+2'])
+    mask &= csr_any_of(preferred_sectors, ['Commerce', 'Santé'])
+    return young_people_df[mask]
+
+
+def filter_typed_job_offers(job_offers_df):
+    filtered = job_offers_df[category_mask(job_offers_df['status'], ['Active'])]
+    filtered = filtered[category_mask(filtered['sector'], ['Commerce', 'Santé', 'Logistique'])]
+    filtered = filtered[category_mask(filtered['contract_type'], ['CDI', 'Alternance'])]
+    return filtered[category_mask(filtered['location'], ['Chartres Centre', 'Lucé'])]
+
+
+def run_scale(n_rows, repeats, seed):
+    young_people_df, _, job_offers_df = generate_synthetic_data(
+        n_young=n_rows, n_companies=max(n_rows // 10, 1), n_offers=n_rows, seed=seed
+    )
+    typed_young_people_df = apply_schema(young_people_df, YOUNG_PEOPLE_SCHEMA)
+    typed_job_offers_df = apply_schema(job_offers_df, JOB_OFFERS_SCHEMA)
+    preferred_sectors = to_csr(young_people_df['preferred_sectors'])
+    vocabularies = build_vocabularies(young_people_df, job_offers_df)
+    young = encode_young_people(young_people_df, vocabularies)
+    offers = encode_job_offers(job_offers_df, vocabularies)
+    one_young, one_offer = take_rows(young, [0]), take_rows(offers, [0])
+    scores = score_encoded(young, one_offer)[:, 0]
+    ids = young['ids']
+    cohort = take_rows(young, slice(0, BLOCKED_COHORT))
+
+    results = {
+        'encode_young_people': best_time(lambda: encode_young_people(young_people_df, vocabularies), max(repeats // 2, 1)),
+        'score_offer_vs_young_people': best_time(lambda: score_encoded(young, one_offer), repeats),
+        'score_young_vs_offers': best_time(lambda: score_encoded(one_young, offers), repeats),
+        'filter_young_people': best_time(lambda: filter_young_people(young_people_df), repeats),
+        'filter_typed_young_people': best_time(lambda: filter_typed_young_people(typed_young_people_df, preferred_sectors), repeats),
+        'filter_job_offers': best_time(lambda: filter_job_offers(job_offers_df), repeats),
+        'filter_typed_job_offers': best_time(lambda: filter_typed_job_offers(typed_job_offers_df), repeats),
+        'sort_scores': best_time(lambda: pd.DataFrame({'young_id': ids, 'match_score': scores}).sort_values('match_score', ascending=False).head(10), repeats),
+        'top_k_scores': best_time(lambda: top_k(scores, ids, 10), repeats),
+        'blocked_top_k': best_time(
+            lambda: blocked_top_k(cohort, offers, memory_budget_mb=BLOCKED_MEMORY_BUDGET_MB), max(repeats // 2, 1)
+        ),
+    }
+    # Mesure mémoire sur un appel séparé, pour ne pas ralentir les appels chronométrés
+    peak_memory_mb = blocked_top_k(
+        cohort, offers, memory_budget_mb=BLOCKED_MEMORY_BUDGET_MB, measure_memory=True
+    )['peak_memory_mb']
+    return (
+        {f'{metric}@{n_rows}': seconds for metric, seconds in results.items()},
+        {f'blocked_top_k@{n_rows}': peak_memory_mb},
+    )
+
+
+# Mesures dont le temps dépasse celui de référence de plus du seuil (en proportion)
+def find_regressions(results, baseline, threshold):
+    regressions = []
+    for metric, seconds in results.items():
+        reference = baseline.get('results', {}).get(metric)
+        if reference and seconds > reference * (1 + threshold):
+            regressions.append((metric, reference, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks du pipeline de matching")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="Nombre de jeunes et d'offres")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", default="benchmark.json", help="Fichier JSON des résultats")
+    parser.add_argument("--baseline", default=None, help="Fichier JSON de référence pour détecter les régressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Régression tolérée (0.25 = +25 %%)")
+    args = parser.parse_args(argv)
+
+    results, peak_memory = {}, {}
+    for n_rows in args.scales:
+        print(f"Échelle {n_rows} lignes...", file=sys.stderr)
+        timings, memory = run_scale(n_rows, args.repeats, args.seed)
+        results.update(timings)
+        peak_memory.update(memory)
+
+    report = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'machine': machine_info(),
+        'seed': args.seed,
+        'results': results,
+        'peak_memory_mb': peak_memory,
+    }
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=2, ensure_ascii=False)
+
+    for metric, seconds in results.items():
+        print(f"{metric:<45} {seconds * 1000:>12.3f} ms")
+    for metric, megabytes in peak_memory.items():
+        print(f"{'pic mémoire ' + metric:<45} {megabytes:>12.1f} Mo")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            regressions = find_regressions(results, json.load(baseline_file), args.threshold)
+        for metric, reference, seconds in regressions:
+            print(f"RÉGRESSION {metric} : {reference * 1000:.3f} ms -> {seconds * 1000:.3f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
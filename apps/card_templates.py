@@ -0,0 +1,210 @@
+# Rendu groupé des cartes (jeunes, offres, résultats de matching, suivi)
+# Toutes les cartes d'une section sont assemblées en un seul bloc HTML, à partir de gabarits préparés
+# une fois au chargement du module et de classes CSS communes (pas de styles répétés dans chaque carte) :
+# une section = un seul appel à st.markdown.
+from html import escape
+
+from matching_engine import COMPONENT_WEIGHTS
+
+CARD_CSS = """
+    .card-grid {
+        display: grid;
+        grid-template-columns: repeat(2, minmax(0, 1fr));
+        gap: 0 1rem;
+    }
+    .card-match {
+        display: flex;
+        align-items: center;
+    }
+    .card-match-score {
+        flex: 0.2;
+    }
+    .card-match-body {
+        flex: 0.8;
+        padding-left: 15px;
+    }
+    .card-header {
+        display: flex;
+        justify-content: space-between;
+    }
+    .card-actions {
+        display: flex;
+        justify-content: flex-end;
+        margin-top: 10px;
+    }
+    .card-button {
+        color: white;
+        border: none;
+        padding: 5px 10px;
+        border-radius: 5px;
+        cursor: pointer;
+        margin-left: 10px;
+        background-color: #90c5b5;
+    }
+    .card-button-primary {
+        background-color: #2a6d81;
+    }
+    .score-details {
+        font-size: 0.85rem;
+        color: #2a6d81;
+    }
+    .status-badge {
+        padding: 5px 10px;
+        border-radius: 20px;
+        font-size: 0.8rem;
+    }
+    .status-offer-active { border-left: 5px solid #c9dfd6; }
+    .status-offer-filled { border-left: 5px solid #f0f0f0; }
+    .status-offer-pending { border-left: 5px solid #f9f9f9; }
+    .status-proposed { border-left: 5px solid #f0f7f4; }
+    .status-interview-planned { border-left: 5px solid #c9dfd6; }
+    .status-interview-done { border-left: 5px solid #90c5b5; }
+    .status-hired { border-left: 5px solid #2a6d81; }
+    .status-refused { border-left: 5px solid #f7e4e4; }
+    .status-badge.status-proposed { background-color: #f0f7f4; }
+    .status-badge.status-interview-planned { background-color: #c9dfd6; }
+    .status-badge.status-interview-done { background-color: #90c5b5; }
+    .status-badge.status-hired { background-color: #2a6d81; color: white; }
+    .status-badge.status-refused { background-color: #f7e4e4; }
+"""
+
+OFFER_STATUS_CLASSES = {'Active': 'status-offer-active', 'Pourvu': 'status-offer-filled', 'En attente': 'status-offer-pending'}
+
+FOLLOW_UP_STATUS_CLASSES = {
+    'Proposé': 'status-proposed',
+    'Entretien programmé': 'status-interview-planned',
+    'Entretien réalisé': 'status-interview-done',
+    'Embauche': 'status-hired',
+    'Refus employeur': 'status-refused',
+    'Refus candidat': 'status-refused',
+}
+
+# Gabarits (les valeurs sont échappées avant insertion)
+_ACTIONS = '<div class="card-actions">{buttons}</div>'
+_BUTTON = '<button class="card-button{primary}">{label}</button>'
+
+_YOUNG_CARD = (
+    '<div class="card"><h3>{name} ({age} ans)</h3>'
+    '<p><strong>Qualification:</strong> {qualification}</p>'
+    '<p><strong>Expérience:</strong> {experience_years} an(s)</p>'
+    '<p><strong>Statut:</strong> {status}</p>'
+    '<p><strong>Secteurs préférés:</strong> {preferred_sectors}</p>'
+    '<p><strong>Compétences:</strong> {skills}</p>'
+    '<p><strong>Contrats recherchés:</strong> {preferred_contracts}</p>'
+    '<p><strong>Mobilité:</strong> {mobility} km autour de {preferred_location}</p>'
+    '{actions}</div>'
+)
+
+_OFFER_CARD = (
+    '<div class="card {status_class}"><h3>{title} - {company_name}</h3>'
+    '<p><strong>Secteur:</strong> {sector} | <strong>Contrat:</strong> {contract_type}</p>'
+    '<p><strong>Qualification requise:</strong> {required_qualification} | <strong>Expérience:</strong> {required_experience} an(s)</p>'
+    '<p><strong>Localisation:</strong> {location} | <strong>Publication:</strong> {publication_date}</p>'
+    '<p><strong>Compétences requises:</strong> {required_skills}</p>'
+    '<p><strong>Statut:</strong> {status} | <strong>Candidatures:</strong> {applications}</p>'
+    '</div>'
+)
+
+_OFFER_MATCH_CARD = (
+    '<div class="card card-match"><div class="card-match-score"><div class="match-score {score_class}">{match_score}%</div></div>'
+    '<div class="card-match-body"><h3>{title} - {company_name}</h3>'
+    '<p><strong>Secteur:</strong> {sector} | <strong>Contrat:</strong> {contract_type}</p>'
+    '<p><strong>Localisation:</strong> {location}</p>{details}{actions}</div></div>'
+)
+
+_YOUNG_MATCH_CARD = (
+    '<div class="card card-match"><div class="card-match-score"><div class="match-score {score_class}">{match_score}%</div></div>'
+    '<div class="card-match-body"><h3>{name} ({age} ans)</h3>'
+    '<p><strong>Qualification:</strong> {qualification} | <strong>Expérience:</strong> {experience_years} an(s)</p>'
+    '<p><strong>Compétences:</strong> {top_skills}...</p>{details}{actions}</div></div>'
+)
+
+_DETAILS = '<p class="score-details">{items}</p>'
+_DETAIL_ITEM = '{label} {points}/{weight}'
+
+_FOLLOW_UP_CARD = (
+    '<div class="card {status_class}"><div class="card-header">'
+    '<div><h3>{young_name} → {offer_title} ({company_name})</h3></div>'
+    '<div><span class="status-badge {status_class}">{status}</span></div></div>'
+    '<p><strong>Date de mise en relation:</strong> {match_date} | <strong>Dernière mise à jour:</strong> {last_update}</p>'
+    '<p><strong>Notes:</strong> {notes}</p>{actions}</div>'
+)
+
+
+# Libellés des critères du score (colonnes points_<critère> des résultats de matching)
+COMPONENT_LABELS = {
+    'skills': 'Compétences', 'sector': 'Secteur', 'contract': 'Contrat',
+    'qualification': 'Qualification', 'experience': 'Expérience', 'location': 'Localisation',
+}
+
+
+def actions(*labels):
+    return _ACTIONS.format(buttons=''.join(
+        _BUTTON.format(primary=' card-button-primary' if i == 0 else '', label=escape(label)) for i, label in enumerate(labels)
+    ))
+
+
+def score_class(score):
+    return "match-high" if score >= 70 else "match-medium" if score >= 40 else "match-low"
+
+
+def _text(value):
+    return escape(', '.join(map(str, value)) if isinstance(value, (list, tuple)) else str(value))
+
+
+def _fill(template, record, **extra):
+    values = {key: _text(value) for key, value in record.items()}
+    values.update(extra)
+    return template.format_map(values)
+
+
+# Ligne de détail du score (vide si les résultats n'ont pas de colonnes points_<critère>) ;
+# weights : part maximale de chaque critère en % (component_weights du plan de score)
+def score_details(record, weights=COMPONENT_WEIGHTS):
+    if 'points_skills' not in record:
+        return ''
+    return _DETAILS.format(items=' · '.join(
+        _DETAIL_ITEM.format(label=label, points=record[f'points_{criterion}'], weight=weights[criterion])
+        for criterion, label in COMPONENT_LABELS.items()
+    ))
+
+
+def young_cards(records):
+    buttons = actions("Voir le profil complet", "Contacter")
+    return [_fill(_YOUNG_CARD, record, actions=buttons) for record in records]
+
+
+def offer_cards(records):
+    return [_fill(_OFFER_CARD, record, status_class=OFFER_STATUS_CLASSES.get(record['status'], '')) for record in records]
+
+
+def offer_match_cards(records, weights=COMPONENT_WEIGHTS):
+    buttons = actions("Voir l'offre", "Proposer ce candidat")
+    return [
+        _fill(_OFFER_MATCH_CARD, record, score_class=score_class(record['match_score']),
+              details=score_details(record, weights), actions=buttons)
+        for record in records
+    ]
+
+
+def young_match_cards(records, with_actions=True, weights=COMPONENT_WEIGHTS):
+    buttons = actions("Voir le profil", "Proposer cette offre") if with_actions else ''
+    return [
+        _fill(_YOUNG_MATCH_CARD, record, score_class=score_class(record['match_score']),
+              top_skills=_text(list(record['skills'])[:3]), details=score_details(record, weights), actions=buttons)
+        for record in records
+    ]
+
+
+def follow_up_cards(records):
+    buttons = actions("Mettre à jour le statut", "Ajouter une note")
+    return [
+        _fill(_FOLLOW_UP_CARD, record, status_class=FOLLOW_UP_STATUS_CLASSES.get(record['status'], ''),
+              notes=_text(record['notes'] or 'Aucune note'), actions=buttons)
+        for record in records
+    ]
+
+
+# Bloc HTML d'une section : cartes les unes sous les autres, ou sur deux colonnes
+def card_block(cards, grid=False):
+    return f'<div class="card-grid">{"".join(cards)}</div>' if grid else ''.join(cards)
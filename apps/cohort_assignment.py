@@ -0,0 +1,119 @@
+# Affectation globale d'une cohorte de jeunes aux offres (mariages stables avec capacités)
+# Chaque jeune propose ses candidatures dans l'ordre de ses meilleurs scores (au plus proposal_limit offres
+# au-dessus du score minimum : graphe creux des candidats, calculé par blocs) ; chaque offre garde les
+# capacity meilleurs jeunes reçus. Les propositions sont traitées par tours, en tableaux NumPy : tous
+# les jeunes libres proposent en même temps, puis chaque offre trie ses candidats retenus et nouveaux.
+import numpy as np
+import pandas as pd
+
+from matching_engine import blocked_top_k
+
+DEFAULT_PROPOSAL_LIMIT = 10
+DEFAULT_CAPACITY = 1
+
+
+# Graphe des candidats au format CSR : pour le jeune i, ses offres par préférence décroissante sont
+# offers[offsets[i]:offsets[i + 1]] (score décroissant, puis position d'offre croissante)
+# pair_filter : contraintes strictes (couples écartés avant le score, voir hard_constraints.constraint_mask)
+def candidate_graph(young, offers, proposal_limit=DEFAULT_PROPOSAL_LIMIT, min_score=0, memory_budget_mb=256, distances=None,
+                    plan=None, pair_filter=None):
+    result = blocked_top_k(
+        young, offers, k=proposal_limit, memory_budget_mb=memory_budget_mb, distances=distances, plan=plan, pair_filter=pair_filter
+    )
+    positions, scores = result['offers_for_young'], result['offers_for_young_scores']
+    # Lignes triées par score décroissant : les couples retenus forment un préfixe de chaque ligne
+    kept = (positions >= 0) & (scores >= min_score)
+    offsets = np.zeros(len(positions) + 1, dtype=np.int64)
+    np.cumsum(kept.sum(axis=1), out=offsets[1:])
+    return {'offsets': offsets, 'offers': positions[kept], 'scores': scores[kept], 'n_offers': len(offers['ids'])}
+
+
+# Acceptation différée, jeunes proposants : résultat stable et optimal pour les jeunes. Une offre
+# préfère le meilleur score, puis le jeune de plus petite position. capacity : entier ou tableau par offre.
+def stable_assignment(graph, capacity=DEFAULT_CAPACITY):
+    offsets, edge_offers, edge_scores = graph['offsets'], graph['offers'], graph['scores']
+    n_young = len(offsets) - 1
+    capacity = np.broadcast_to(np.asarray(capacity, dtype=np.int64), (graph['n_offers'],))
+    list_lengths = np.diff(offsets)
+    edge_young = np.repeat(np.arange(n_young), list_lengths)
+    next_choice = np.zeros(n_young, dtype=np.int64)
+    held = np.full(n_young, -1, dtype=np.int64)
+    rounds = 0
+    while True:
+        free = np.flatnonzero((held < 0) & (next_choice < list_lengths))
+        if not len(free):
+            break
+        proposals = offsets[free] + next_choice[free]
+        next_choice[free] += 1
+        pool = np.concatenate([held[held >= 0], proposals])
+        pool = pool[np.lexsort((edge_young[pool], -edge_scores[pool], edge_offers[pool]))]
+        pool_offers = edge_offers[pool]
+        rank_in_offer = np.arange(len(pool)) - np.searchsorted(pool_offers, pool_offers)
+        accepted = pool[rank_in_offer < capacity[pool_offers]]
+        held[:] = -1
+        held[edge_young[accepted]] = accepted
+        rounds += 1
+
+    assigned = np.flatnonzero(held >= 0)
+    edges = held[assigned]
+    return {
+        'young': assigned,
+        'offers': edge_offers[edges],
+        'scores': edge_scores[edges],
+        'choice': edges - offsets[assigned] + 1,
+        'rounds': rounds,
+    }
+
+
+# Couples (jeune, offre) non affectés qui se préféreraient mutuellement à leur affectation (vide si stable)
+def blocking_pairs(graph, assignment, capacity=DEFAULT_CAPACITY):
+    offsets, edge_offers, edge_scores = graph['offsets'], graph['offers'], graph['scores']
+    n_young, n_offers = len(offsets) - 1, graph['n_offers']
+    capacity = np.broadcast_to(np.asarray(capacity, dtype=np.int64), (n_offers,))
+    edge_young = np.repeat(np.arange(n_young), np.diff(offsets))
+    # Rang de l'affectation dans la liste du jeune (longueur de la liste si non affecté)
+    current_choice = np.diff(offsets).copy()
+    current_choice[assignment['young']] = assignment['choice'] - 1
+    # Moins bon jeune retenu par chaque offre (clé score, -position), et nombre de places occupées
+    filled = np.bincount(assignment['offers'], minlength=n_offers)
+    worst_key = np.full(n_offers, np.iinfo(np.int64).max)
+    np.minimum.at(worst_key, assignment['offers'], assignment['scores'] * (n_young + 1) + (n_young - assignment['young']))
+    edge_choice = np.arange(len(edge_offers)) - offsets[edge_young]
+    edge_key = edge_scores * (n_young + 1) + (n_young - edge_young)
+    blocking = (edge_choice < current_choice[edge_young]) & (
+        (filled[edge_offers] < capacity[edge_offers]) | (edge_key > worst_key[edge_offers])
+    )
+    return np.column_stack([edge_young[blocking], edge_offers[blocking]])
+
+
+# Affectation d'une cohorte (sous-ensembles de jeunes et d'offres donnés par positions) ; positions d'origine
+def assign_cohort(young, offers, young_positions, offer_positions, capacity=DEFAULT_CAPACITY,
+                  proposal_limit=DEFAULT_PROPOSAL_LIMIT, min_score=0, memory_budget_mb=256, distances=None, plan=None,
+                  pair_filter=None):
+    young_positions, offer_positions = np.asarray(young_positions), np.asarray(offer_positions)
+    if not len(young_positions) or not len(offer_positions):
+        empty = np.empty(0, dtype=np.int64)
+        return {'young': empty, 'offers': empty, 'scores': empty, 'choice': empty, 'rounds': 0, 'candidate_pairs': 0}
+    cohort = {key: values[young_positions] for key, values in young.items()}
+    cohort_offers = {key: values[offer_positions] for key, values in offers.items()}
+    graph = candidate_graph(cohort, cohort_offers, proposal_limit, min_score, memory_budget_mb, distances, plan, pair_filter)
+    assignment = stable_assignment(graph, capacity)
+    assignment['young'] = young_positions[assignment['young']]
+    assignment['offers'] = offer_positions[assignment['offers']]
+    assignment['candidate_pairs'] = len(graph['offers'])
+    return assignment
+
+
+# Tableau des affectations (une ligne par couple retenu, colonnes du suivi des mises en relation)
+def assignment_frame(assignment, young_people_df, job_offers_df):
+    young_rows = young_people_df.iloc[assignment['young']]
+    offer_rows = job_offers_df.iloc[assignment['offers']]
+    return pd.DataFrame({
+        'young_id': young_rows['id'].to_numpy(),
+        'young_name': young_rows['name'].to_numpy(),
+        'offer_id': offer_rows['id'].to_numpy(),
+        'offer_title': offer_rows['title'].to_numpy(),
+        'company_name': offer_rows['company_name'].to_numpy(),
+        'match_score': assignment['scores'],
+        'choice': assignment['choice'],
+    })
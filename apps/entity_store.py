@@ -0,0 +1,38 @@
+# Accès direct aux jeunes, entreprises et offres par identifiant
+# Pour chaque table : dictionnaire identifiant -> position de ligne et libellés d'affichage préconstruits
+# (listes de sélection, cartes), pour ne plus parcourir les tables à chaque recherche.
+
+# Libellé affiché pour chaque table
+ENTITY_LABELS = {
+    'young': lambda df: df['name'].astype(str) + ' (' + df['id'].astype(str) + ')',
+    'companies': lambda df: df['name'].astype(str) + ' (' + df['id'].astype(str) + ')',
+    'offers': lambda df: df['title'].astype(str) + ' - ' + df['company_name'].astype(str) + ' (' + df['id'].astype(str) + ')',
+}
+
+
+def build_entities(df, label):
+    ids = df['id'].to_numpy()
+    return {
+        'ids': ids,
+        'positions': dict(zip(ids.tolist(), range(len(ids)))),
+        'labels': label(df).tolist() if len(df) else [],
+    }
+
+
+def build_entity_store(young_people_df, companies_df, job_offers_df):
+    return {
+        'young': build_entities(young_people_df, ENTITY_LABELS['young']),
+        'companies': build_entities(companies_df, ENTITY_LABELS['companies']),
+        'offers': build_entities(job_offers_df, ENTITY_LABELS['offers']),
+    }
+
+
+# Position de la ligne (None si l'identifiant est inconnu)
+def entity_position(store, kind, entity_id):
+    return store[kind]['positions'].get(entity_id)
+
+
+def entity_label(store, kind, entity_id):
+    position = entity_position(store, kind, entity_id)
+    return store[kind]['labels'][position] if position is not None else str(entity_id)
+
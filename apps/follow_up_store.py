@@ -0,0 +1,253 @@
+# Suivi des mises en relation persistant
+# Journal d'événements en ajout seul (un changement de statut par ligne, fichier CSV) et table de l'état
+# courant reconstruite au chargement par relecture du journal. La table courante est indexée par statut,
+# date de mise en relation, jeune et offre : les filtres de la page de suivi sont des recherches d'index.
+# Les dates sont converties une seule fois en datetime64 et gardées triées (recherche dichotomique des
+# périodes) ; le nombre de mises en relation par mois est tenu à jour à chaque ajout. La recherche
+# (candidat, entreprise, intitulé) passe par un index de trigrammes.
+import os
+import csv
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from trigram_index import TrigramIndex
+
+FOLLOW_UP_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'suivi_evenements.csv')
+
+STATUSES = ['Proposé', 'Entretien programmé', 'Entretien réalisé', 'Embauche', 'Refus employeur', 'Refus candidat']
+ONGOING_STATUSES = ['Proposé', 'Entretien programmé', 'Entretien réalisé']
+REJECTED_STATUSES = ['Refus employeur', 'Refus candidat']
+
+# Transitions autorisées (Embauche et les refus sont des états finaux)
+TRANSITIONS = {
+    'Proposé': ['Entretien programmé'] + REJECTED_STATUSES,
+    'Entretien programmé': ['Entretien réalisé'] + REJECTED_STATUSES,
+    'Entretien réalisé': ['Embauche'] + REJECTED_STATUSES,
+    'Embauche': [],
+    'Refus employeur': [],
+    'Refus candidat': [],
+}
+
+EVENT_COLUMNS = ['match_id', 'event_date', 'status', 'young_id', 'young_name', 'offer_id', 'offer_title', 'company_name', 'notes']
+STATE_COLUMNS = ['id', 'young_id', 'young_name', 'offer_id', 'offer_title', 'company_name', 'match_date', 'status', 'last_update', 'notes']
+
+
+class FollowUpStore:
+    def __init__(self, path=FOLLOW_UP_LOG_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.columns = {column: [] for column in STATE_COLUMNS}
+        self.positions = {}
+        self.status_index = {status: set() for status in STATUSES}
+        # Dates (jours) et mois de mise en relation par position, dans des tampons à capacité doublée
+        self.days = np.empty(1024, dtype='datetime64[D]')
+        self.months = np.empty(1024, dtype=np.int64)
+        self.sorted_days = np.empty(0, dtype='datetime64[D]')
+        self.date_order = np.empty(0, dtype=np.int64)
+        self.unsorted_positions = []
+        self.first_month = None
+        self.month_counts = np.zeros(0, dtype=np.int64)
+        self.young_index = {}
+        self.offer_index = {}
+        self.search_index = TrigramIndex()
+        self.version = 0
+        self._frame = None
+        if os.path.exists(path):
+            with open(path, newline='', encoding='utf-8') as log:
+                for event in csv.DictReader(log):
+                    self._apply(event)
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    # Mise à jour de la table courante et des index pour un événement du journal
+    def _apply(self, event):
+        match_id, status = event['match_id'], event['status']
+        position = self.positions.get(match_id)
+        if position is None:
+            position = len(self)
+            self.positions[match_id] = position
+            for column, value in [
+                ('id', match_id), ('young_id', event['young_id']), ('young_name', event['young_name']),
+                ('offer_id', event['offer_id']), ('offer_title', event['offer_title']),
+                ('company_name', event['company_name']), ('match_date', event['event_date']),
+                ('status', status), ('last_update', event['event_date']), ('notes', event['notes']),
+            ]:
+                self.columns[column].append(value)
+            self._add_date(position, np.datetime64(event['event_date'], 'D'))
+            self.young_index.setdefault(event['young_id'], []).append(position)
+            self.offer_index.setdefault(event['offer_id'], []).append(position)
+            self.search_index.add(event['young_name'], event['company_name'], event['offer_title'])
+        else:
+            self.status_index[self.columns['status'][position]].discard(position)
+            self.columns['status'][position] = status
+            self.columns['last_update'][position] = event['event_date']
+            if event['notes']:
+                self.columns['notes'][position] = event['notes']
+        self.status_index[status].add(position)
+        self.version += 1
+        self._frame = None
+
+    def _add_date(self, position, day):
+        if position == len(self.days):
+            self.days = np.concatenate([self.days, np.empty_like(self.days)])
+            self.months = np.concatenate([self.months, np.empty_like(self.months)])
+        month = int(day.astype('datetime64[M]').astype(np.int64))
+        self.days[position], self.months[position] = day, month
+        if self.first_month is None:
+            self.first_month = month
+        if month < self.first_month:
+            self.month_counts = np.concatenate([np.zeros(self.first_month - month, dtype=np.int64), self.month_counts])
+            self.first_month = month
+        if month - self.first_month >= len(self.month_counts):
+            self.month_counts = np.concatenate([
+                self.month_counts, np.zeros(month - self.first_month - len(self.month_counts) + 1, dtype=np.int64)
+            ])
+        self.month_counts[month - self.first_month] += 1
+        self.unsorted_positions.append(position)
+
+    # Insertion des dates ajoutées depuis la dernière recherche à leur place dans l'index trié, en une
+    # seule fois (au premier appel, tri de tout le journal relu)
+    def _sort_dates(self):
+        if not self.unsorted_positions:
+            return
+        positions = np.array(self.unsorted_positions, dtype=np.int64)
+        self.unsorted_positions = []
+        positions = positions[np.argsort(self.days[positions], kind='stable')]
+        days = self.days[positions]
+        slots = np.searchsorted(self.sorted_days, days, side='right')
+        self.sorted_days = np.insert(self.sorted_days, slots, days)
+        self.date_order = np.insert(self.date_order, slots, positions)
+
+    def _append(self, *events):
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'a', newline='', encoding='utf-8') as log:
+            writer = csv.DictWriter(log, fieldnames=EVENT_COLUMNS)
+            if new_file:
+                writer.writeheader()
+            writer.writerows(events)
+        for event in events:
+            self._apply(event)
+
+    # Nouvelle mise en relation (statut "Proposé") ; renvoie son identifiant
+    def propose(self, young_id, young_name, offer_id, offer_title, company_name, date, notes=''):
+        with self.lock:
+            match_id = f'M{len(self) + 1:03d}'
+            self._append({
+                'match_id': match_id, 'event_date': date, 'status': 'Proposé',
+                'young_id': young_id, 'young_name': young_name, 'offer_id': offer_id,
+                'offer_title': offer_title, 'company_name': company_name, 'notes': notes,
+            })
+            return match_id
+
+    # Plusieurs mises en relation écrites en une fois (lignes avec young_id, young_name, offer_id,
+    # offer_title, company_name : affectation d'une cohorte) ; renvoie leurs identifiants
+    def propose_many(self, rows, date, notes=''):
+        with self.lock:
+            events = [
+                {
+                    'match_id': f'M{len(self) + i + 1:03d}', 'event_date': date, 'status': 'Proposé',
+                    'young_id': row['young_id'], 'young_name': row['young_name'], 'offer_id': row['offer_id'],
+                    'offer_title': row['offer_title'], 'company_name': row['company_name'], 'notes': notes,
+                }
+                for i, row in enumerate(rows)
+            ]
+            self._append(*events)
+            return [event['match_id'] for event in events]
+
+    def update_status(self, match_id, status, date, notes=''):
+        with self.lock:
+            position = self.positions.get(match_id)
+            if position is None:
+                raise KeyError(f"Mise en relation inconnue : {match_id}")
+            current = self.columns['status'][position]
+            if status not in TRANSITIONS[current]:
+                raise ValueError(f"Transition impossible : {current} -> {status}")
+            self._append({
+                'match_id': match_id, 'event_date': date, 'status': status,
+                'young_id': self.columns['young_id'][position], 'young_name': '', 'offer_id': self.columns['offer_id'][position],
+                'offer_title': '', 'company_name': '', 'notes': notes,
+            })
+
+    # Table de l'état courant (reconstruite seulement après une modification)
+    def frame(self):
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.columns, columns=STATE_COLUMNS)
+        return self._frame
+
+    # Positions des mises en relation correspondant aux filtres (None = pas de filtre sur ce critère),
+    # dans l'ordre des lignes : masques booléens des index combinés par ET
+    def query(self, statuses=None, start_date=None, end_date=None, young_id=None, offer_id=None, search=None):
+        mask = None
+        for positions in [
+            self._status_positions(statuses) if statuses else None,
+            self.date_range(start_date, end_date) if start_date or end_date else None,
+            self.young_index.get(young_id, []) if young_id is not None else None,
+            self.offer_index.get(offer_id, []) if offer_id is not None else None,
+            self.search_index.search(search) if search else None,
+        ]:
+            if positions is not None:
+                criterion = np.zeros(len(self), dtype=bool)
+                criterion[positions] = True
+                mask = criterion if mask is None else mask & criterion
+        if mask is None:
+            return np.arange(len(self))
+        return np.flatnonzero(mask)
+
+    def _status_positions(self, statuses):
+        members = set().union(*(self.status_index.get(status, ()) for status in statuses))
+        return np.fromiter(members, dtype=np.int64, count=len(members))
+
+    # Positions des mises en relation entre deux dates incluses (tranche de l'index trié)
+    def date_range(self, start_date=None, end_date=None):
+        self._sort_dates()
+        start = 0 if start_date is None else np.searchsorted(self.sorted_days, np.datetime64(start_date, 'D'), side='left')
+        stop = len(self) if end_date is None else np.searchsorted(self.sorted_days, np.datetime64(end_date, 'D'), side='right')
+        return self.date_order[start:stop]
+
+    # Nombre de mises en relation par mois ('AAAA-MM' -> nombre, mois sans mise en relation omis) :
+    # compteurs tenus à jour pour l'ensemble du suivi, décompte des mois des positions sinon
+    def monthly_counts(self, positions=None):
+        if self.first_month is None:
+            return {}
+        if positions is None:
+            counts = self.month_counts
+        else:
+            counts = np.bincount(self.months[positions] - self.first_month, minlength=len(self.month_counts))
+        months = np.flatnonzero(counts)
+        labels = (months + self.first_month).astype('datetime64[M]').astype(str)
+        return dict(zip(labels.tolist(), counts[months].tolist()))
+
+    def status_counts(self, positions=None):
+        if positions is None:
+            return {status: len(members) for status, members in self.status_index.items()}
+        statuses = np.asarray(self.columns['status'], dtype=object)[positions]
+        return {status: int((statuses == status).sum()) for status in STATUSES}
+
+
+# Historique de démonstration : n mises en relation tirées au hasard (graine fixe), chacune avançant
+# de quelques étapes dans le parcours de statuts
+def seed_demo_follow_ups(store, young_people_df, job_offers_df, n_matches=20, seed=42, reference_date=None):
+    if young_people_df.empty or job_offers_df.empty:
+        return
+    rng = np.random.default_rng(seed)
+    reference = datetime.strptime(reference_date, '%Y-%m-%d') if reference_date else datetime.now()
+    young_positions = rng.integers(0, len(young_people_df), n_matches)
+    offer_positions = rng.integers(0, len(job_offers_df), n_matches)
+    for young_position, offer_position in zip(young_positions.tolist(), offer_positions.tolist()):
+        date = reference - timedelta(days=int(rng.integers(1, 61)))
+        young, offer = young_people_df.iloc[young_position], job_offers_df.iloc[offer_position]
+        match_id = store.propose(
+            young['id'], young['name'], offer['id'], offer['title'], offer['company_name'], date.strftime('%Y-%m-%d')
+        )
+        status = 'Proposé'
+        for _ in range(int(rng.integers(0, 4))):
+            if not TRANSITIONS[status]:
+                break
+            status = TRANSITIONS[status][int(rng.integers(0, len(TRANSITIONS[status])))]
+            date = min(date + timedelta(days=int(rng.integers(1, 10))), reference)
+            notes = f"Note de suivi pour la mise en relation {match_id}" if rng.random() > 0.5 else ''
+            store.update_status(match_id, status, date.strftime('%Y-%m-%d'), notes)
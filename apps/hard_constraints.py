@@ -0,0 +1,62 @@
+# Contraintes strictes appliquées avant le score pondéré (étape de pré-filtrage du matching)
+# Les règles des conseillers ("toutes les compétences requises", "qualification au moins égale à celle
+# requise", "expérience suffisante") deviennent des masques booléens vectorisés ; seuls les couples qui
+# les respectent sont transmis au score. Le score minimum reste appliqué après le score (et par l'élagage
+# des index inversés avant). Les champs ordinaux sont comparés directement (une comparaison vectorisée
+# par champ) : le niveau de qualification de chaque entité est précalculé par plan de score.
+import numpy as np
+
+from matching_engine import DEFAULT_PLAN
+
+HARD_CONSTRAINTS = {
+    'all_skills': "Toutes les compétences requises",
+    'qualification': "Qualification au moins égale à celle requise",
+    'experience': "Expérience au moins égale à celle requise",
+}
+
+
+# Niveaux de qualification des deux côtés ; ils dépendent du plan de score (profil)
+def build_constraint_index(young, offers, plan=None):
+    levels = (plan or DEFAULT_PLAN)['qualification_levels']
+    return {
+        'young_level': levels[young['qualification']],
+        'offer_level': levels[offers['qualification']],
+    }
+
+
+# Positions (croissantes) des offres respectant les contraintes pour le jeune à la position donnée
+def eligible_offers(young, position, offers, index, constraints):
+    eligible = np.ones(len(offers['ids']), dtype=bool)
+    if 'qualification' in constraints:
+        eligible &= index['offer_level'] <= index['young_level'][position]
+    if 'experience' in constraints:
+        eligible &= offers['experience'] <= young['experience'][position]
+    if 'all_skills' in constraints:
+        eligible &= ~(offers['skills'] & ~young['skills'][position]).any(axis=1)
+    return np.flatnonzero(eligible)
+
+
+# Positions (croissantes) des jeunes respectant les contraintes de l'offre à la position donnée
+def eligible_young_people(offers, position, young, index, constraints):
+    eligible = np.ones(len(young['ids']), dtype=bool)
+    if 'qualification' in constraints:
+        eligible &= index['young_level'] >= index['offer_level'][position]
+    if 'experience' in constraints:
+        eligible &= young['experience'] >= offers['experience'][position]
+    if 'all_skills' in constraints:
+        eligible &= ~(offers['skills'][position] & ~young['skills']).any(axis=1)
+    return np.flatnonzero(eligible)
+
+
+# Masque jeunes x offres des couples respectant les contraintes (filtre de blocked_top_k, via functools.partial)
+def constraint_mask(young, offers, constraints=(), plan=None):
+    mask = np.ones((len(young['ids']), len(offers['ids'])), dtype=bool)
+    if 'qualification' in constraints:
+        levels = (plan or DEFAULT_PLAN)['qualification_levels']
+        mask &= levels[young['qualification']][:, None] >= levels[offers['qualification']][None, :]
+    if 'experience' in constraints:
+        mask &= young['experience'][:, None] >= offers['experience'][None, :]
+    if 'all_skills' in constraints:
+        for word in range(offers['skills'].shape[1]):
+            mask &= (offers['skills'][None, :, word] & ~young['skills'][:, None, word]) == 0
+    return mask
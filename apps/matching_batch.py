@@ -0,0 +1,183 @@
+# Traitement par lots du matching (hors Streamlit)
+# Calcule le top N des offres pour chaque jeune et le top N des candidats pour chaque offre.
+# Les jeunes sont répartis en lots entre plusieurs processus ; les tableaux des offres, en lecture seule,
+# sont placés une seule fois en mémoire partagée au lieu d'être sérialisés pour chaque tâche.
+#
+# Utilisation (sans l'interface Streamlit) :
+# python apps/matching_batch.py --output resultats_matching --top 10 --workers 4
+# python apps/matching_batch.py --data donnees_simulees --data-format parquet --output resultats_matching
+import os
+import sys
+import glob
+import time
+import argparse
+from datetime import datetime
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from matching_engine import (
+    blocked_top_k, take_rows, merge_top_k, decode_top_k, build_vocabularies, encode_young_people, encode_job_offers,
+    load_commune_coordinates, distance_matrix
+)
+from hard_constraints import HARD_CONSTRAINTS, constraint_mask
+from scoring_profiles import load_scoring_profiles, scoring_plan, DEFAULT_PROFILE
+from synthetic_data import generate_synthetic_data, load_synthetic_data, DEFAULT_SEED
+
+YOUNG_RESULTS_DIR = 'offres_pour_jeunes'
+OFFER_RESULTS_DIR = 'candidats_pour_offres'
+
+# Tableaux des offres attachés à la mémoire partagée dans chaque processus de calcul
+_shared_offers = {}
+_shared_blocks = []
+
+
+# Copie des tableaux en mémoire partagée ; les identifiants sont convertis en chaînes de largeur fixe
+def share_arrays(encoded):
+    blocks, spec = [], {}
+    for key, values in encoded.items():
+        values = np.ascontiguousarray(values.astype(str) if values.dtype == object else values)
+        block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+        blocks.append(block)
+        spec[key] = (block.name, values.shape, values.dtype.str)
+    return blocks, spec
+
+
+def _attach_offers(spec):
+    for key, (name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=name)
+        _shared_blocks.append(block)
+        _shared_offers[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def _write_frame(frame, directory, shard_index, file_format):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'part-{shard_index:05d}.{file_format}')
+    if file_format == 'parquet':
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+    return path
+
+
+def _ranked_frame(owner_ids, positions, scores, target_ids, owner_column, target_column):
+    k = positions.shape[1]
+    valid = positions.ravel() >= 0
+    return pd.DataFrame({
+        owner_column: np.repeat(owner_ids, k)[valid],
+        'rank': np.tile(np.arange(1, k + 1), len(owner_ids))[valid],
+        target_column: target_ids[positions.ravel()[valid]],
+        'match_score': scores.ravel()[valid],
+    })
+
+
+# Tâche d'un processus : top N des offres pour un lot de jeunes, écrit directement dans son fichier,
+# et top N partiel des candidats par offre (positions globales) renvoyé pour fusion
+def _match_shard(shard_index, young_shard, start, k, memory_budget_mb, output_dir, file_format, distances, plan, pair_filter):
+    result = blocked_top_k(
+        young_shard, _shared_offers, k=k, memory_budget_mb=memory_budget_mb, distances=distances, plan=plan, pair_filter=pair_filter
+    )
+    frame = _ranked_frame(
+        young_shard['ids'], result['offers_for_young'], result['offers_for_young_scores'],
+        _shared_offers['ids'], 'young_id', 'offer_id'
+    )
+    _write_frame(frame, os.path.join(output_dir, YOUNG_RESULTS_DIR), shard_index, file_format)
+    young_positions = np.where(result['young_for_offers'] >= 0, result['young_for_offers'] + start, -1)
+    return young_positions, result['young_for_offers_scores']
+
+
+# Suppression des fichiers d'un traitement précédent (le nombre de lots peut avoir changé)
+def _clear_results(output_dir):
+    for results_dir in (YOUNG_RESULTS_DIR, OFFER_RESULTS_DIR):
+        for path in glob.glob(os.path.join(output_dir, results_dir, 'part-*')):
+            os.remove(path)
+
+
+def run_batch_matching(young, offers, output_dir, k=10, workers=None, shard_size=5000,
+                       memory_budget_mb=256, file_format='csv', offer_shard_size=5000, progress=None, distances=None, plan=None,
+                       pair_filter=None):
+    started = time.time()
+    _clear_results(output_dir)
+    n_young, n_offers = len(young['ids']), len(offers['ids'])
+    blocks, spec = share_arrays(offers)
+    offer_keys = np.full((n_offers, min(k, n_young)), -1, dtype=np.int64)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_offers, initargs=(spec,)) as executor:
+            futures = []
+            for shard_index, start in enumerate(range(0, n_young, shard_size)):
+                young_shard = take_rows(young, slice(start, min(start + shard_size, n_young)))
+                futures.append(executor.submit(
+                    _match_shard, shard_index, young_shard, start, k, memory_budget_mb, output_dir, file_format, distances, plan, pair_filter
+                ))
+            for done, future in enumerate(as_completed(futures), start=1):
+                positions, scores = future.result()
+                keys = np.where(positions >= 0, scores * (n_young + 1) + (n_young - positions), -1)
+                offer_keys = merge_top_k(offer_keys, keys, offer_keys.shape[1])
+                if progress is not None:
+                    progress(done, len(futures))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    # Top N des candidats par offre, fusionné puis écrit en lots d'offres
+    young_ids = np.asarray(young['ids']).astype(str)
+    offer_ids = np.asarray(offers['ids']).astype(str)
+    positions, scores = decode_top_k(offer_keys, n_young)
+    for shard_index, start in enumerate(range(0, n_offers, offer_shard_size)):
+        stop = min(start + offer_shard_size, n_offers)
+        frame = _ranked_frame(offer_ids[start:stop], positions[start:stop], scores[start:stop], young_ids, 'offer_id', 'young_id')
+        _write_frame(frame, os.path.join(output_dir, OFFER_RESULTS_DIR), shard_index, file_format)
+
+    return {
+        'young': n_young,
+        'offers': n_offers,
+        'young_shards': len(range(0, n_young, shard_size)),
+        'seconds': time.time() - started,
+    }
+
+
+if __name__ == "__main__":
+    scoring_profiles = load_scoring_profiles()
+    parser = argparse.ArgumentParser(description="Matching par lots : top N des offres par jeune et des candidats par offre")
+    parser.add_argument("--data", default=None, help="Dossier des données (jeunes, entreprises, offres) ; par défaut, "
+                                                     "données simulées de l'application")
+    parser.add_argument("--data-format", choices=["csv", "parquet"], default="csv", help="Format des fichiers de --data")
+    parser.add_argument("--output", default="resultats_matching", help="Dossier de sortie des fichiers par lots")
+    parser.add_argument("--top", type=int, default=10, help="Nombre de résultats conservés par jeune et par offre")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (par défaut : nombre de cœurs)")
+    parser.add_argument("--shard-size", type=int, default=5000, help="Nombre de jeunes par lot")
+    parser.add_argument("--memory-budget", type=float, default=256, help="Budget mémoire par processus (Mo)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Format des fichiers de sortie")
+    parser.add_argument("--mobility", action="store_true", help="Score de localisation selon le rayon de mobilité du jeune")
+    parser.add_argument("--profile", choices=list(scoring_profiles), default=DEFAULT_PROFILE, help="Profil de score")
+    parser.add_argument("--constraint", action="append", choices=list(HARD_CONSTRAINTS), default=[],
+                        help="Contrainte stricte appliquée avant le score (option répétable)")
+    args = parser.parse_args()
+    plan = scoring_plan(scoring_profiles[args.profile])
+
+    if args.data:
+        young_people_df, _, job_offers_df = load_synthetic_data(args.data, args.data_format)
+    else:
+        young_people_df, _, job_offers_df = generate_synthetic_data(
+            n_young=30, n_companies=10, seed=DEFAULT_SEED, reference_date=datetime.now().strftime('%Y-%m-%d')
+        )
+    vocabularies = build_vocabularies(young_people_df, job_offers_df)
+    young = encode_young_people(young_people_df, vocabularies)
+    offers = encode_job_offers(job_offers_df, vocabularies)
+    distances = distance_matrix(vocabularies['locations'], load_commune_coordinates()) if args.mobility else None
+
+    # Tous les jeunes face aux offres actives
+    active_positions = np.flatnonzero(job_offers_df['status'].to_numpy() == 'Active')
+    summary = run_batch_matching(
+        young, take_rows(offers, active_positions), args.output,
+        k=args.top, workers=args.workers, shard_size=args.shard_size,
+        memory_budget_mb=args.memory_budget, file_format=args.format, distances=distances, plan=plan,
+        pair_filter=partial(constraint_mask, constraints=args.constraint, plan=plan) if args.constraint else None,
+        progress=lambda done, total: print(f"Lot {done}/{total} terminé", file=sys.stderr)
+    )
+    print(f"{summary['young']} jeunes x {summary['offers']} offres en {summary['seconds']:.1f} s ({summary['young_shards']} lots)")
@@ -0,0 +1,651 @@
+# Moteur de matching vectorisé pour Match'Emploi
+# Les scores sont calculés pour tous les couples (jeune, offre) en une seule fois
+# avec NumPy, selon la pondération du plan de score (profil ; par défaut 40/20/15/10/10/5).
+import os
+import math
+import tracemalloc
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+QUALIFICATION_LEVELS = {'Sans diplôme': 0, 'CAP/BEP': 1, 'Bac': 2, 'Bac+2': 3, 'Bac+3 et plus': 4}
+
+# Pondération des critères (total = 100)
+SKILLS_WEIGHT = 40
+SECTOR_WEIGHT = 20
+CONTRACT_WEIGHT = 15
+QUALIFICATION_WEIGHT = 10
+EXPERIENCE_WEIGHT = 10
+LOCATION_WEIGHT = 5
+MAX_SCORE = SKILLS_WEIGHT + SECTOR_WEIGHT + CONTRACT_WEIGHT + QUALIFICATION_WEIGHT + EXPERIENCE_WEIGHT + LOCATION_WEIGHT
+
+
+# Construction d'un vocabulaire (libellé -> indice) à partir de colonnes simples ou multi-valuées
+def build_vocabulary(*columns):
+    values = set()
+    for column in columns:
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = np.unique(column.cat.codes.to_numpy())
+            values.update(column.cat.categories[codes[codes >= 0]])
+            continue
+        for cell in column:
+            if isinstance(cell, (list, tuple, set, np.ndarray)):
+                values.update(cell)
+            elif not pd.isna(cell):
+                values.add(cell)
+    return {value: i for i, value in enumerate(sorted(values, key=str))}
+
+
+def build_vocabularies(young_people_df, job_offers_df):
+    return {
+        'skills': build_vocabulary(young_people_df['skills'], job_offers_df['required_skills']),
+        'sectors': build_vocabulary(young_people_df['preferred_sectors'], job_offers_df['sector']),
+        'contracts': build_vocabulary(young_people_df['preferred_contracts'], job_offers_df['contract_type']),
+        'locations': build_vocabulary(young_people_df['preferred_location'], job_offers_df['location']),
+    }
+
+
+# Encodage d'une colonne de listes en masques de bits de largeur fixe
+# Chaque ligne occupe ceil(taille du vocabulaire / 64) mots uint64, quelle que soit la taille du vocabulaire
+def bitset_width(vocabulary):
+    return max((len(vocabulary) + 63) // 64, 1)
+
+
+def encode_bitsets(column, vocabulary):
+    bitsets = np.zeros((len(column), bitset_width(vocabulary)), dtype=np.uint64)
+    rows = np.array([i for i, cell in enumerate(column) for value in cell if value in vocabulary], dtype=np.int64)
+    codes = np.array([vocabulary[value] for cell in column for value in cell if value in vocabulary], dtype=np.int64)
+    bits = np.left_shift(np.uint64(1), (codes % 64).astype(np.uint64))
+    np.bitwise_or.at(bitsets, (rows, codes // 64), bits)
+    return bitsets
+
+
+# Nombre de bits à 1 par élément (np.bitwise_count à partir de NumPy 2.0, table de 256 entrées sinon)
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(array):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(array)
+    as_bytes = np.ascontiguousarray(array).view(np.uint8).reshape(array.shape + (-1,))
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+# Taille de l'intersection entre deux ensembles de masques (matrice n x m) : ET bit à bit + popcount
+def bitset_overlap(left, right):
+    overlap = np.zeros((left.shape[0], right.shape[0]), dtype=np.int64)
+    for word in range(left.shape[1]):
+        overlap += popcount(left[:, word][:, None] & right[:, word][None, :])
+    return overlap
+
+
+# Variantes couple à couple (ligne i de gauche avec ligne i de droite) : vecteurs de longueur n
+def bitset_overlap_pairs(left, right):
+    return popcount(left & right).sum(axis=1, dtype=np.int64)
+
+
+def bitset_contains_pairs(bitsets, codes):
+    known = codes >= 0
+    safe_codes = np.where(known, codes, 0)
+    words = bitsets[np.arange(len(codes)), safe_codes // 64]
+    return ((words >> (safe_codes % 64).astype(np.uint64)) & np.uint64(1)).astype(bool) & known
+
+
+# Appartenance du code de chaque colonne aux masques de chaque ligne (code -1 = valeur inconnue)
+def bitset_contains(bitsets, codes):
+    known = codes >= 0
+    safe_codes = np.where(known, codes, 0)
+    words = bitsets[:, safe_codes // 64]
+    words >>= (safe_codes % 64).astype(np.uint64)
+    words &= np.uint64(1)
+    return words.astype(bool) & known[None, :]
+
+
+# Encodage d'une colonne simple en codes entiers (-1 si la valeur est inconnue)
+# Pour une colonne catégorielle, la correspondance est calculée une fois par catégorie puis appliquée aux codes
+def _codes(column, vocabulary, default=-1):
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        lookup = np.array([vocabulary.get(value, default) for value in column.cat.categories] + [default], dtype=np.int64)
+        return lookup[column.cat.codes.to_numpy()]
+    return np.array([vocabulary.get(value, default) for value in column], dtype=np.int64)
+
+
+def _qualification_codes(column):
+    return _codes(column, QUALIFICATION_LEVELS, default=0).astype(np.int8)
+
+
+def encode_young_people(young_people_df, vocabularies):
+    return {
+        'ids': young_people_df['id'].to_numpy(),
+        'skills': encode_bitsets(young_people_df['skills'], vocabularies['skills']),
+        'sectors': encode_bitsets(young_people_df['preferred_sectors'], vocabularies['sectors']),
+        'contracts': encode_bitsets(young_people_df['preferred_contracts'], vocabularies['contracts']),
+        'qualification': _qualification_codes(young_people_df['qualification']),
+        'experience': young_people_df['experience_years'].to_numpy(dtype=np.int64),
+        'location': _codes(young_people_df['preferred_location'], vocabularies['locations']),
+        'mobility': young_people_df['mobility'].to_numpy(dtype=np.float32),
+    }
+
+
+def encode_job_offers(job_offers_df, vocabularies):
+    skills = encode_bitsets(job_offers_df['required_skills'], vocabularies['skills'])
+    return {
+        'ids': job_offers_df['id'].to_numpy(),
+        'skills': skills,
+        'n_skills': popcount(skills).sum(axis=1, dtype=np.int64),
+        'sector': _codes(job_offers_df['sector'], vocabularies['sectors']),
+        'contract': _codes(job_offers_df['contract_type'], vocabularies['contracts']),
+        'qualification': _qualification_codes(job_offers_df['required_qualification']),
+        'experience': job_offers_df['required_experience'].to_numpy(dtype=np.int64),
+        'location': _codes(job_offers_df['location'], vocabularies['locations']),
+    }
+
+
+# Sous-ensemble d'un encodage par positions de lignes
+def take_rows(encoded, positions):
+    return {key: values[positions] for key, values in encoded.items()}
+
+
+# Critères du score, dans l'ordre d'addition des points
+COMPONENTS = ['skills', 'sector', 'contract', 'qualification', 'experience', 'location']
+COMPONENT_WEIGHTS = {
+    'skills': SKILLS_WEIGHT, 'sector': SECTOR_WEIGHT, 'contract': CONTRACT_WEIGHT,
+    'qualification': QUALIFICATION_WEIGHT, 'experience': EXPERIENCE_WEIGHT, 'location': LOCATION_WEIGHT,
+}
+
+
+# Plan de score compilé à partir d'une pondération (profil de score) :
+# - weights : points de chaque critère, max_score : leur total ;
+# - qualification_levels : niveau de chaque code de QUALIFICATION_LEVELS (table de correspondance) ;
+# - component_weights : part de chaque critère dans le score en %, pour le détail du score ;
+# - unreachable_without_overlap : score maximal d'un couple sans compétence, secteur ni contrat en commun.
+def compile_scoring_plan(weights, qualification_levels=None):
+    weights = {criterion: weights[criterion] for criterion in COMPONENTS}
+    max_score = sum(weights.values())
+    levels = qualification_levels or QUALIFICATION_LEVELS
+    return {
+        'weights': weights,
+        'max_score': max_score,
+        'component_scale': 100 / max_score,
+        'qualification_levels': np.array([levels[label] for label in QUALIFICATION_LEVELS], dtype=np.int8),
+        'component_weights': {criterion: round(weight / max_score * 100) for criterion, weight in weights.items()},
+        'unreachable_without_overlap': round(
+            (weights['qualification'] + weights['experience'] + weights['location']) / max_score * 100
+        ),
+    }
+
+
+DEFAULT_PLAN = compile_scoring_plan(COMPONENT_WEIGHTS)
+
+
+# Points de chaque critère (compétences en flottant, les autres valant 0 ou leur poids), calculés un critère
+# à la fois dans l'ordre de COMPONENTS : chaque tableau est ajouté au total (et au détail) puis libéré avant
+# le suivant, de sorte qu'un seul tableau de points coexiste avec le total.
+# Avec une matrice de distances, le critère de localisation devient "offre dans le rayon de mobilité".
+# pairwise : jeunes et offres alignés ligne à ligne (un couple par ligne) au lieu de la matrice jeunes x offres.
+def _criterion_terms(young, offers, distances=None, plan=None, pairwise=False):
+    plan = plan or DEFAULT_PLAN
+    weights, levels = plan['weights'], plan['qualification_levels']
+    if pairwise:
+        rows, columns = (lambda values: values), (lambda values: values)
+        overlap, contains = bitset_overlap_pairs, bitset_contains_pairs
+    else:
+        rows, columns = (lambda values: values[:, None]), (lambda values: values[None, :])
+        overlap, contains = bitset_overlap, bitset_contains
+    skills = overlap(young['skills'], offers['skills']) / np.maximum(columns(offers['n_skills']), 1)
+    skills *= weights['skills']
+    yield 'skills', skills
+    del skills
+    yield 'sector', np.where(contains(young['sectors'], offers['sector']), weights['sector'], 0)
+    yield 'contract', np.where(contains(young['contracts'], offers['contract']), weights['contract'], 0)
+    yield 'qualification', np.where(
+        rows(levels[young['qualification']]) >= columns(levels[offers['qualification']]), weights['qualification'], 0
+    )
+    yield 'experience', np.where(rows(young['experience']) >= columns(offers['experience']), weights['experience'], 0)
+    if distances is None:
+        location_match = (rows(young['location']) == columns(offers['location'])) & (rows(young['location']) >= 0)
+    else:
+        location_match = distances[rows(young['location']), columns(offers['location'])] <= rows(young['mobility'])
+    yield 'location', np.where(location_match, weights['location'], 0)
+
+
+# Points de tous les critères à la fois (caractéristiques de l'apprentissage des poids)
+def criterion_points(young, offers, distances=None, plan=None, pairwise=False):
+    return dict(_criterion_terms(young, offers, distances, plan, pairwise))
+
+
+# Total des points dans l'ordre de COMPONENTS, pour des arrondis identiques quel que soit le chemin de calcul ;
+# avec components (tableau structuré), le détail de chaque critère y est écrit au passage
+def _total_score(terms, plan, components=None):
+    score = None
+    for criterion, points in terms:
+        if components is not None:
+            components[criterion] = np.rint(points * plan['component_scale'])
+        if score is None:
+            score = points.astype(np.float64, copy=False)
+        else:
+            score += points
+        del points
+    score /= plan['max_score']
+    score *= 100
+    return np.rint(score, out=score).astype(np.int64)
+
+
+# Score de matching pour des jeunes et des offres déjà encodés
+def score_encoded(young, offers, distances=None, plan=None):
+    plan = plan or DEFAULT_PLAN
+    return _total_score(_criterion_terms(young, offers, distances, plan), plan)
+
+
+# Scores de couples (jeune, offre) alignés ligne à ligne
+def score_pairs(young, offers, distances=None, plan=None):
+    plan = plan or DEFAULT_PLAN
+    return _total_score(_criterion_terms(young, offers, distances, plan, pairwise=True), plan)
+
+
+# Scores des seuls couples retenus par un masque jeunes x offres (-1 pour les couples écartés) ;
+# au-delà de cette proportion de couples retenus, le calcul matriciel complet reste plus rapide
+MASKED_SCORING_DENSITY = 0.3
+
+
+def score_masked(young, offers, mask, distances=None, plan=None):
+    if mask.mean() > MASKED_SCORING_DENSITY:
+        return np.where(mask, score_encoded(young, offers, distances, plan), -1)
+    rows, columns = np.nonzero(mask)
+    scores = np.full(mask.shape, -1, dtype=np.int64)
+    scores[rows, columns] = score_pairs(take_rows(young, rows), take_rows(offers, columns), distances, plan)
+    return scores
+
+
+# Détail du score par critère : tableau structuré compact (un int8 par critère, part du score en %
+# arrondie ; les compétences arrondies peuvent faire différer la somme du total d'un point)
+COMPONENT_DTYPE = np.dtype([(criterion, np.int8) for criterion in COMPONENTS])
+
+
+# Scores et détail par critère en une seule passe
+def score_with_components(young, offers, distances=None, plan=None):
+    plan = plan or DEFAULT_PLAN
+    terms = _criterion_terms(young, offers, distances, plan)
+    components = np.empty((len(young['ids']), len(offers['ids'])), dtype=COMPONENT_DTYPE)
+    return _total_score(terms, plan, components), components
+
+
+# Index inversés (libellé -> positions triées des entités qui le portent)
+# Un couple sans compétence, secteur ni contrat en commun ne peut pas dépasser ce score
+UNREACHABLE_WITHOUT_OVERLAP = DEFAULT_PLAN['unreachable_without_overlap']
+
+
+def _postings_from_codes(codes, size):
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(size + 1))
+    return [order[bounds[code]:bounds[code + 1]] for code in range(size)]
+
+
+def _postings_from_bitsets(bitsets, size):
+    codes = np.arange(size)
+    present = (bitsets[:, codes // 64] >> (codes % 64).astype(np.uint64)) & np.uint64(1)
+    return [np.flatnonzero(present[:, code]) for code in range(size)]
+
+
+def build_offer_index(offers, vocabularies):
+    return {
+        'size': len(offers['ids']),
+        'skills': _postings_from_bitsets(offers['skills'], len(vocabularies['skills'])),
+        'sector': _postings_from_codes(offers['sector'], len(vocabularies['sectors'])),
+        'contract': _postings_from_codes(offers['contract'], len(vocabularies['contracts'])),
+    }
+
+
+def build_young_index(young, vocabularies):
+    return {
+        'size': len(young['ids']),
+        'skills': _postings_from_bitsets(young['skills'], len(vocabularies['skills'])),
+        'sectors': _postings_from_bitsets(young['sectors'], len(vocabularies['sectors'])),
+        'contracts': _postings_from_bitsets(young['contracts'], len(vocabularies['contracts'])),
+    }
+
+
+def _bitset_codes(bitset_row):
+    codes = np.arange(bitset_row.shape[0] * 64)
+    return codes[((bitset_row[codes // 64] >> (codes % 64).astype(np.uint64)) & np.uint64(1)).astype(bool)]
+
+
+def _union(postings_lists):
+    postings = [postings for postings in postings_lists if len(postings)]
+    if not postings:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate(postings))
+
+
+# Positions des offres pouvant atteindre min_score pour le jeune à la position donnée
+def candidate_offers(young, position, offer_index, min_score, plan=None):
+    if min_score <= (plan or DEFAULT_PLAN)['unreachable_without_overlap']:
+        return np.arange(offer_index['size'])
+    postings = [offer_index['skills'][code] for code in _bitset_codes(young['skills'][position])]
+    postings += [offer_index['sector'][code] for code in _bitset_codes(young['sectors'][position])]
+    postings += [offer_index['contract'][code] for code in _bitset_codes(young['contracts'][position])]
+    return _union(postings)
+
+
+# Positions des jeunes pouvant atteindre min_score pour l'offre à la position donnée
+def candidate_young_people(offers, position, young_index, min_score, plan=None):
+    if min_score <= (plan or DEFAULT_PLAN)['unreachable_without_overlap']:
+        return np.arange(young_index['size'])
+    postings = [young_index['skills'][code] for code in _bitset_codes(offers['skills'][position])]
+    if offers['sector'][position] >= 0:
+        postings.append(young_index['sectors'][offers['sector'][position]])
+    if offers['contract'][position] >= 0:
+        postings.append(young_index['contracts'][offers['contract'][position]])
+    return _union(postings)
+
+
+# Sélection des k meilleurs scores sans tri complet, départage stable par identifiant
+# Pour des scores entiers bornés (0..max_score), le seuil est le plus haut score dont le cumul des effectifs
+# (bincount, en partant du haut) atteint k ; seuls les scores au-dessus du seuil sont ensuite triés.
+# Sinon, le seuil vient d'une sélection partielle par argpartition.
+def top_k(scores, ids, k, max_score=100):
+    scores = np.asarray(scores)
+    if np.issubdtype(scores.dtype, np.unsignedinteger):
+        scores = scores.astype(np.int64)
+    ids = np.asarray(ids)
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= len(scores):
+        selected = np.arange(len(scores))
+    elif np.issubdtype(scores.dtype, np.integer) and max_score is not None:
+        counts_from_top = np.cumsum(np.bincount(np.clip(scores, 0, max_score), minlength=max_score + 1)[::-1])
+        threshold = max_score - np.searchsorted(counts_from_top, k)
+        selected = np.flatnonzero(scores >= threshold)
+    else:
+        threshold = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        selected = np.flatnonzero(scores >= threshold)
+    order = np.lexsort((ids[selected].astype(str), -scores[selected]))[:k]
+    return selected[order]
+
+
+# Répartition des scores par tranches (comptage direct, sans construire de DataFrame)
+def score_histogram(scores, bin_width=10, max_score=100):
+    n_bins = max_score // bin_width
+    bins = np.minimum(np.asarray(scores, dtype=np.int64) // bin_width, n_bins - 1)
+    counts = np.bincount(bins, minlength=n_bins)
+    labels = [f"{i * bin_width}-{(i + 1) * bin_width - 1 if i < n_bins - 1 else max_score}" for i in range(n_bins)]
+    return pd.DataFrame({'Score de matching (%)': labels, "Nombre": counts})
+
+
+# Matrice matérialisée des scores jeunes x offres, mise à jour de façon incrémentale
+# - modifier, ajouter ou clôturer une offre ne recalcule qu'une colonne ;
+# - modifier un profil marque sa ligne comme périmée (tampon de version), recalculée à la prochaine lecture.
+# Les lignes passées aux méthodes d'ajout / modification doivent être encodées avec les mêmes vocabulaires.
+# Une matrice correspond à un plan de score (profil) : une matrice par profil utilisé.
+class MatchMatrix:
+    def __init__(self, young, offers, distances=None, plan=None, memory_budget_mb=64):
+        self.young = {key: np.array(values) for key, values in young.items()}
+        self.offers = {key: np.array(values) for key, values in offers.items()}
+        self.distances = distances
+        self.plan = plan or DEFAULT_PLAN
+        self.memory_budget_mb = memory_budget_mb
+        self.version = 0
+        n_young, n_offers = len(self.young['ids']), len(self.offers['ids'])
+        self.scores = np.zeros((n_young, n_offers), dtype=np.uint8)
+        self.components = np.zeros((n_young, n_offers), dtype=COMPONENT_DTYPE)
+        self._score_rows(np.arange(n_young))
+        self.row_versions = np.zeros(len(self.young['ids']), dtype=np.int64)
+        self.young_versions = np.zeros(len(self.young['ids']), dtype=np.int64)
+        self.active_offers = np.ones(len(self.offers['ids']), dtype=bool)
+
+    @staticmethod
+    def _set_row(encoded, position, row):
+        for key, values in encoded.items():
+            values[position] = row[key][0]
+
+    @staticmethod
+    def _append_row(encoded, row):
+        for key in encoded:
+            encoded[key] = np.concatenate([encoded[key], row[key]])
+        return len(encoded['ids']) - 1
+
+    # Scores de lignes par blocs de lignes complètes (temporaires de criterion_points bornés par le budget mémoire)
+    def _score_rows(self, positions):
+        n_offers = len(self.offers['ids'])
+        block_rows, block_cols = block_shape(len(positions), n_offers, self.memory_budget_mb)
+        step = max(block_rows * block_cols // max(n_offers, 1), 1)
+        for start in range(0, len(positions), step):
+            rows = positions[start:start + step]
+            self.scores[rows], self.components[rows] = score_with_components(
+                take_rows(self.young, rows), self.offers, self.distances, self.plan
+            )
+
+    def _score_column(self, position):
+        scores, components = score_with_components(self.young, take_rows(self.offers, [position]), self.distances, self.plan)
+        self.scores[:, position], self.components[:, position] = scores[:, 0], components[:, 0]
+
+    def update_young(self, position, young_row):
+        self._set_row(self.young, position, young_row)
+        self.version += 1
+        self.young_versions[position] = self.version
+
+    def add_young(self, young_row):
+        position = self._append_row(self.young, young_row)
+        self.version += 1
+        self.scores = np.vstack([self.scores, np.zeros((1, self.scores.shape[1]), dtype=np.uint8)])
+        self.components = np.vstack([self.components, np.zeros((1, self.components.shape[1]), dtype=COMPONENT_DTYPE)])
+        self.row_versions = np.append(self.row_versions, -1)
+        self.young_versions = np.append(self.young_versions, self.version)
+        return position
+
+    def update_offer(self, position, offer_row):
+        self._set_row(self.offers, position, offer_row)
+        self.version += 1
+        self._score_column(position)
+
+    def add_offer(self, offer_row):
+        position = self._append_row(self.offers, offer_row)
+        self.version += 1
+        self.scores = np.hstack([self.scores, np.zeros((self.scores.shape[0], 1), dtype=np.uint8)])
+        self.components = np.hstack([self.components, np.zeros((self.components.shape[0], 1), dtype=COMPONENT_DTYPE)])
+        self.active_offers = np.append(self.active_offers, True)
+        self._score_column(position)
+        return position
+
+    # Une offre clôturée reste dans les tableaux (positions stables) mais n'est plus jamais lue comme résultat
+    def close_offer(self, position):
+        self.version += 1
+        self.active_offers[position] = False
+
+    # Recalcul des lignes périmées (toutes, ou seulement parmi les positions demandées)
+    def refresh(self, young_positions=None):
+        stale = np.flatnonzero(self.row_versions < self.young_versions)
+        if young_positions is not None:
+            stale = stale[np.isin(stale, young_positions)]
+        if len(stale):
+            self._score_rows(stale)
+            self.row_versions[stale] = self.version
+        return len(stale)
+
+    # Sous-matrice des scores pour des positions de jeunes et d'offres (-1, sous tout score minimum,
+    # pour les offres clôturées)
+    def submatrix(self, young_positions, offer_positions):
+        self.refresh(young_positions)
+        scores = self.scores[np.ix_(young_positions, offer_positions)].astype(np.int64)
+        scores[:, ~self.active_offers[offer_positions]] = -1
+        return scores
+
+    # Détail par critère (tableau structuré) pour des positions de jeunes et d'offres (zéros pour les offres clôturées)
+    def component_submatrix(self, young_positions, offer_positions):
+        self.refresh(young_positions)
+        components = self.components[np.ix_(young_positions, offer_positions)]
+        components[:, ~self.active_offers[offer_positions]] = 0
+        return components
+
+
+# Mode "proximité des libellés" : similarité TF-IDF sur n-grammes de caractères
+# Les textes sont hachés une seule fois (HashingVectorizer, sans vocabulaire à apprendre) ; la pondération IDF,
+# tirée des fréquences documentaires des jeunes et des offres, est appliquée aux matrices creuses à la
+# première lecture.
+SEMANTIC_WEIGHT = 0.3
+
+
+def young_profile_texts(young_people_df):
+    return [' '.join(list(skills) + list(sectors))
+            for skills, sectors in zip(young_people_df['skills'], young_people_df['preferred_sectors'])]
+
+
+def offer_profile_texts(job_offers_df):
+    return [' '.join([title, sector] + list(skills))
+            for title, sector, skills in zip(job_offers_df['title'], job_offers_df['sector'], job_offers_df['required_skills'])]
+
+
+class TextSimilarityIndex:
+    def __init__(self, young_texts, offer_texts, n_features=2 ** 18):
+        self.vectorizer = HashingVectorizer(
+            analyzer='char_wb', ngram_range=(3, 4), n_features=n_features, alternate_sign=False, norm=None
+        )
+        self.document_frequency = np.zeros(n_features, dtype=np.int64)
+        self.n_documents = 0
+        self.young_counts = self._count(young_texts)
+        self.offer_counts = self._count(offer_texts)
+        self._weighted = None
+
+    def _count(self, texts):
+        counts = self.vectorizer.transform(texts).tocsr()
+        self.document_frequency += np.bincount(counts.indices, minlength=len(self.document_frequency))
+        self.n_documents += counts.shape[0]
+        return counts
+
+    # Matrices TF-IDF normalisées, calculées une seule fois
+    def weighted(self):
+        if self._weighted is None:
+            idf = sparse.diags(np.log((1 + self.n_documents) / (1 + self.document_frequency)) + 1)
+            self._weighted = (normalize(self.young_counts @ idf), normalize(self.offer_counts @ idf))
+        return self._weighted
+
+    # Similarité cosinus pour un bloc de jeunes x offres (produit de matrices creuses déjà normalisées)
+    def similarity(self, young_positions, offer_positions):
+        if not len(young_positions) or not len(offer_positions):
+            return np.zeros((len(young_positions), len(offer_positions)))
+        young_tfidf, offer_tfidf = self.weighted()
+        return (young_tfidf[young_positions] @ offer_tfidf[offer_positions].T).toarray()
+
+
+# Mélange du score pondéré exact et de la similarité des libellés
+def blend_scores(exact_scores, similarity, weight=SEMANTIC_WEIGHT):
+    return np.rint((1 - weight) * exact_scores + weight * 100 * similarity).astype(np.int64)
+
+
+# Score exact minimal pour qu'un score mélangé puisse atteindre min_score (utilisé pour l'élagage)
+def blended_min_exact_score(min_score, weight=SEMANTIC_WEIGHT):
+    return int(np.floor((min_score - 0.5 - 100 * weight) / (1 - weight)))
+
+
+# Calcul par tuiles pour les grandes cohortes : la matrice complète n'est jamais allouée
+# Chaque tuile jeunes x offres est dimensionnée selon un budget mémoire, puis fusionnée dans des
+# top-k glissants par jeune et par offre. Les clés combinent score et position (score décroissant,
+# puis position croissante) pour un départage stable.
+BYTES_PER_PAIR = 64  # majorant des temporaires du score et de la fusion des top-k par couple (pic mesuré : ~40 octets)
+
+
+def block_shape(n_young, n_offers, memory_budget_mb):
+    pairs = max(int(memory_budget_mb * 1024 * 1024 // BYTES_PER_PAIR), 1)
+    block_rows = min(max(n_young, 1), max(int(math.sqrt(pairs)), 1))
+    block_cols = min(max(n_offers, 1), max(pairs // block_rows, 1))
+    return block_rows, block_cols
+
+
+def merge_top_k(current_keys, block_keys, k):
+    merged = np.concatenate([current_keys, block_keys], axis=1)
+    if merged.shape[1] > k:
+        merged = np.take_along_axis(merged, np.argpartition(-merged, k - 1, axis=1)[:, :k], axis=1)
+    return merged
+
+
+def decode_top_k(keys, size):
+    keys = -np.sort(-keys, axis=1)
+    scores = np.where(keys >= 0, keys // (size + 1), -1)
+    positions = np.where(keys >= 0, size - keys % (size + 1), -1)
+    return positions, scores
+
+
+# pair_filter(jeunes, offres) -> masque jeunes x offres : seuls les couples retenus sont scorés (contraintes strictes).
+# measure_memory : pic des allocations mesuré avec tracemalloc (ralentit chaque allocation, réservé aux benchmarks) ;
+# si l'appelant trace déjà, son compteur n'est pas remis à zéro et le pic rapporté est le sien.
+def blocked_top_k(young, offers, k=10, memory_budget_mb=256, progress=None, distances=None, plan=None, pair_filter=None,
+                  measure_memory=False):
+    n_young, n_offers = len(young['ids']), len(offers['ids'])
+    block_rows, block_cols = block_shape(n_young, n_offers, memory_budget_mb)
+    row_keys = np.full((n_young, min(k, n_offers)), -1, dtype=np.int64)
+    col_keys = np.full((n_offers, min(k, n_young)), -1, dtype=np.int64)
+    total_blocks = math.ceil(n_young / block_rows) * math.ceil(n_offers / block_cols)
+
+    started_tracing = measure_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    done_blocks = 0
+    for row_start in range(0, n_young, block_rows):
+        rows = slice(row_start, min(row_start + block_rows, n_young))
+        young_block = take_rows(young, rows)
+        for col_start in range(0, n_offers, block_cols):
+            cols = slice(col_start, min(col_start + block_cols, n_offers))
+            offers_block = take_rows(offers, cols)
+            if pair_filter is None:
+                scores = score_encoded(young_block, offers_block, distances, plan)
+            else:
+                scores = score_masked(young_block, offers_block, pair_filter(young_block, offers_block), distances, plan)
+            offer_positions = np.arange(cols.start, cols.stop)
+            young_positions = np.arange(rows.start, rows.stop)
+            row_keys[rows] = merge_top_k(row_keys[rows], scores * (n_offers + 1) + (n_offers - offer_positions)[None, :], row_keys.shape[1])
+            col_keys[cols] = merge_top_k(col_keys[cols], (scores * (n_young + 1) + (n_young - young_positions)[:, None]).T, col_keys.shape[1])
+            done_blocks += 1
+            if progress is not None:
+                progress(done_blocks, total_blocks)
+    peak_memory = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if measure_memory else None
+    if started_tracing:
+        tracemalloc.stop()
+
+    row_positions, row_scores = decode_top_k(row_keys, n_offers)
+    col_positions, col_scores = decode_top_k(col_keys, n_young)
+    return {
+        'offers_for_young': row_positions,
+        'offers_for_young_scores': row_scores,
+        'young_for_offers': col_positions,
+        'young_for_offers_scores': col_scores,
+        'block_shape': (block_rows, block_cols),
+        'blocks': total_blocks,
+        'peak_memory_mb': peak_memory,
+    }
+
+
+# Géographie : distances entre communes à partir d'une table de coordonnées hors ligne
+# La matrice des distances (communes x communes, en km) est calculée une fois ; le score et le filtre
+# de mobilité se réduisent ensuite à des lectures de tableau. Une commune sans coordonnées n'est à
+# distance finie que d'elle-même.
+COMMUNES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'communes.csv')
+EARTH_RADIUS_KM = 6371.0
+
+
+def load_commune_coordinates(path=COMMUNES_PATH):
+    communes = pd.read_csv(path)
+    return {row.commune: (row.latitude, row.longitude) for row in communes.itertuples(index=False)}
+
+
+# Matrice des distances à vol d'oiseau (haversine) indexée par les codes du vocabulaire des localisations,
+# avec une ligne et une colonne supplémentaires (infinies) pour les localisations inconnues (code -1)
+def distance_matrix(location_vocabulary, coordinates):
+    size = len(location_vocabulary)
+    latitude = np.full(size, np.nan)
+    longitude = np.full(size, np.nan)
+    for location, code in location_vocabulary.items():
+        latitude[code], longitude[code] = coordinates.get(location, (np.nan, np.nan))
+    latitude, longitude = np.radians(latitude), np.radians(longitude)
+    haversine = (np.sin((latitude[:, None] - latitude[None, :]) / 2) ** 2
+                 + np.cos(latitude[:, None]) * np.cos(latitude[None, :]) * np.sin((longitude[:, None] - longitude[None, :]) / 2) ** 2)
+    distances = np.full((size + 1, size + 1), np.inf, dtype=np.float32)
+    distances[:size, :size] = np.nan_to_num(2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(haversine)), nan=np.inf)
+    distances[np.arange(size), np.arange(size)] = 0
+    return distances
+
+
+# Offre située dans le rayon de mobilité du jeune (matrice jeunes x offres)
+def within_mobility(young, offers, distances):
+    return distances[young['location'][:, None], offers['location'][None, :]] <= young['mobility'][:, None]
@@ -0,0 +1,36 @@
+# Pagination côté serveur des listes de cartes (jeunes, offres)
+# Seule la page affichée est extraite de la table ; la page suivante est préparée dans un cache LRU
+# pour que le passage à la page suivante n'ait plus rien à calculer.
+import numpy as np
+
+from shared_lru import SharedLRU
+
+PAGE_SIZES = [10, 20, 50]
+DEFAULT_PAGE_SIZE = 20
+
+
+def page_count(total, page_size):
+    return max(-(-total // page_size), 1)
+
+
+def page_slice(positions, page, page_size):
+    return positions[page * page_size:(page + 1) * page_size]
+
+
+# Lignes (dictionnaires) des pages déjà extraites, par (version des données, table, positions de la page)
+class PageCache:
+    def __init__(self, max_pages=64):
+        self.pages = SharedLRU(max_pages)
+
+    def records(self, version, table, df, positions):
+        positions = tuple(np.asarray(positions).tolist())
+        return self.pages.get((version, table, positions), lambda: df.iloc[list(positions)].to_dict('records'))
+
+    def page(self, version, table, df, positions, page, page_size):
+        return self.records(version, table, df, page_slice(positions, page, page_size))
+
+    # Préparation de la page suivante (appelée après l'affichage de la page courante)
+    def prefetch(self, version, table, df, positions, page, page_size):
+        following = page_slice(positions, page + 1, page_size)
+        if len(following):
+            self.records(version, table, df, following)
@@ -0,0 +1,63 @@
+# Profils de score chargés depuis un fichier de configuration (JSON)
+# Chaque profil (pondération des critères, niveaux de qualification éventuels) est compilé une seule fois
+# en plan de score (vecteurs et tables de correspondance, voir compile_scoring_plan) ; les plans sont
+# mis en cache par empreinte du profil, si bien qu'un profil modifié dans le fichier est recompilé.
+import os
+import json
+import hashlib
+import threading
+
+from matching_engine import COMPONENTS, QUALIFICATION_LEVELS, compile_scoring_plan
+
+SCORING_PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_profiles.json')
+DEFAULT_PROFILE = 'Standard'
+
+_plans = {}
+_plans_lock = threading.Lock()
+
+
+# Vérification d'un profil : poids positifs ou nuls pour chaque critère (total non nul),
+# niveau entier pour chaque qualification connue
+def validate_profile(name, profile):
+    weights = profile.get('weights', {})
+    if sorted(weights) != sorted(COMPONENTS):
+        raise ValueError(f"Profil {name} : poids attendus pour {', '.join(COMPONENTS)}")
+    if any(not isinstance(weight, (int, float)) or weight < 0 for weight in weights.values()) or not sum(weights.values()):
+        raise ValueError(f"Profil {name} : les poids doivent être positifs ou nuls, de total non nul")
+    levels = profile.get('qualification_levels')
+    if levels is not None and (sorted(levels) != sorted(QUALIFICATION_LEVELS) or not all(isinstance(level, int) for level in levels.values())):
+        raise ValueError(f"Profil {name} : un niveau entier est attendu pour chaque qualification")
+    return profile
+
+
+def load_scoring_profiles(path=SCORING_PROFILES_PATH):
+    with open(path, encoding='utf-8') as config:
+        profiles = json.load(config)
+    return {name: validate_profile(name, profile) for name, profile in profiles.items()}
+
+
+# Ajout ou remplacement d'un profil dans le fichier de configuration (profils appris hors ligne)
+def save_scoring_profile(name, profile, path=SCORING_PROFILES_PATH):
+    profiles = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as config:
+            profiles = json.load(config)
+    profiles[name] = validate_profile(name, profile)
+    with open(path, 'w', encoding='utf-8') as config:
+        json.dump(profiles, config, indent=2, ensure_ascii=False)
+        config.write('\n')
+
+
+# Empreinte d'un profil (poids et niveaux seulement : la description n'influe pas sur les scores)
+def profile_hash(profile):
+    content = {'weights': profile['weights'], 'qualification_levels': profile.get('qualification_levels')}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def scoring_plan(profile):
+    key = profile_hash(profile)
+    with _plans_lock:
+        plan = _plans.get(key)
+        if plan is None:
+            plan = _plans[key] = dict(compile_scoring_plan(profile['weights'], profile.get('qualification_levels')), hash=key)
+        return plan
@@ -0,0 +1,33 @@
+# Cache LRU partagé entre les sessions Streamlit (threads du serveur)
+# Le verrou ne protège que la lecture et l'insertion : une valeur absente est calculée hors du verrou
+# (deux sessions peuvent la calculer en même temps, la dernière insertion l'emporte).
+import threading
+from collections import OrderedDict
+
+
+class SharedLRU:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Valeur associée à key, calculée par compute() si elle n'est pas (ou plus) en cache
+    def get(self, key, compute):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+        value = compute()
+        with self.lock:
+            self.misses += 1
+            self.entries[key] = value
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
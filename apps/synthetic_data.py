@@ -0,0 +1,203 @@
+# Générateur de données synthétiques pour Match'Emploi (tests de charge et benchmarks)
+# Produit N jeunes, M entreprises et K offres avec le même schéma de colonnes que generate_dummy_data,
+# par tirages NumPy vectorisés à partir d'une graine fixe : toutes les instances et tous les benchmarks
+# obtiennent exactement le même jeu de données.
+#
+# Utilisation : python apps/synthetic_data.py --young 1000000 --companies 10000 --offers 100000 --output donnees_synthetiques
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+SKILLS = ['Communication', 'Travail d\'équipe', 'Autonomie', 'Rigueur', 'Informatique',
+          'Langues étrangères', 'Vente', 'Service client', 'Gestion de projet', 'Marketing digital']
+
+SECTORS = ['Commerce', 'Administratif', 'Restauration', 'Informatique', 'Industrie',
+           'Santé', 'Communication', 'Logistique', 'BTP', 'Services']
+
+CONTRACT_TYPES = ['CDI', 'CDD', 'Alternance', 'Stage', 'Intérim']
+
+LOCATIONS = ['Chartres Centre', 'Chartres Nord', 'Chartres Sud', 'Lucé', 'Mainvilliers',
+             'Luisant', 'Champhol', 'Lèves', 'Le Coudray', 'Barjouville']
+
+QUALIFICATIONS = ['Sans diplôme', 'CAP/BEP', 'Bac', 'Bac+2', 'Bac+3 et plus']
+
+YOUNG_STATUSES = ['En recherche active', 'En formation', 'En emploi partiel', 'Nouveau']
+
+OFFER_STATUSES = ['Active', 'Pourvu', 'En attente']
+
+COMPANY_NAMES = [
+    'Tech Solutions', 'MarketPro', 'Restaurant Gourmet', 'Logistique Express',
+    'Bâtiment Durable', 'InfoSys', 'Santé Plus', 'Commerce Factory',
+    'Admin Services', 'Communication Créative'
+]
+
+JOB_TITLES = {
+    'Commerce': ['Vendeur', 'Responsable magasin', 'Assistant commercial'],
+    'Administratif': ['Assistant administratif', 'Secrétaire', 'Agent d\'accueil'],
+    'Restauration': ['Serveur', 'Cuisinier', 'Commis de cuisine'],
+    'Informatique': ['Développeur', 'Technicien informatique', 'Support technique'],
+    'Industrie': ['Opérateur de production', 'Technicien de maintenance', 'Magasinier'],
+    'Santé': ['Aide-soignant', 'Agent de service hospitalier', 'Secrétaire médical'],
+    'Communication': ['Assistant communication', 'Community manager', 'Chargé d\'événementiel'],
+    'Logistique': ['Préparateur de commandes', 'Cariste', 'Agent logistique'],
+    'BTP': ['Maçon', 'Électricien', 'Peintre'],
+    'Services': ['Agent d\'entretien', 'Auxiliaire de vie', 'Agent de sécurité']
+}
+
+DEFAULT_SEED = 42
+REFERENCE_DATE = '2025-03-01'
+
+LIST_COLUMNS = ['skills', 'preferred_sectors', 'preferred_contracts', 'required_skills']
+LIST_SEPARATOR = '|'
+
+
+# Tirage sans remise de low..high éléments parmi values, pour chaque ligne (permutations aléatoires tronquées)
+def _sample_lists(rng, n, values, low, high):
+    values = np.array(values, dtype=object)
+    order = np.argsort(rng.random((n, len(values))), axis=1)[:, :high]
+    sizes = rng.integers(low, high + 1, n)
+    return [row[:size] for row, size in zip(values[order].tolist(), sizes.tolist())]
+
+
+def _dates(rng, n, min_days, max_days, reference_date):
+    days = rng.integers(min_days, max_days + 1, n)
+    return (np.datetime64(reference_date, 'D') - days).astype(str)
+
+
+def _ids(prefix, numbers, width=3):
+    return np.char.add(prefix, np.char.zfill(numbers.astype(str), width))
+
+
+def generate_young_people(rng, n_young, reference_date=REFERENCE_DATE):
+    numbers = np.arange(1, n_young + 1)
+    return pd.DataFrame({
+        'id': _ids('J', numbers),
+        'name': np.char.add('Jeune ', numbers.astype(str)),
+        'age': rng.integers(18, 27, n_young),
+        'qualification': rng.choice(QUALIFICATIONS, n_young),
+        'skills': _sample_lists(rng, n_young, SKILLS, 3, 6),
+        'preferred_sectors': _sample_lists(rng, n_young, SECTORS, 2, 4),
+        'preferred_contracts': _sample_lists(rng, n_young, CONTRACT_TYPES, 1, 3),
+        'mobility': rng.integers(5, 31, n_young),
+        'preferred_location': rng.choice(LOCATIONS, n_young),
+        'experience_years': rng.integers(0, 6, n_young),
+        'registration_date': _dates(rng, n_young, 1, 365, reference_date),
+        'last_appointment': _dates(rng, n_young, 1, 90, reference_date),
+        'status': rng.choice(YOUNG_STATUSES, n_young),
+    })
+
+
+def generate_companies(rng, n_companies, reference_date=REFERENCE_DATE):
+    numbers = np.arange(1, n_companies + 1)
+    names = np.array(COMPANY_NAMES, dtype=object)[(numbers - 1) % len(COMPANY_NAMES)]
+    # Au-delà des noms prédéfinis, le numéro de l'entreprise est ajouté pour garder des noms uniques
+    names = np.where(numbers > len(COMPANY_NAMES), names + ' ' + numbers.astype(str), names)
+    return pd.DataFrame({
+        'id': _ids('E', numbers),
+        'name': names,
+        'sector': rng.choice(SECTORS, n_companies),
+        'size': rng.choice(['TPE', 'PME', 'Grande entreprise'], n_companies),
+        'location': rng.choice(LOCATIONS, n_companies),
+        'contact_person': np.char.add('Contact ', numbers.astype(str)),
+        'last_contact': _dates(rng, n_companies, 1, 120, reference_date),
+        'partnership_level': rng.choice(['Nouveau', 'Régulier', 'Partenaire privilégié'], n_companies),
+    })
+
+
+# Offres rattachées aux entreprises : n_offers au total, ou 1 à 3 par entreprise si n_offers vaut None
+def generate_job_offers(rng, companies_df, n_offers=None, reference_date=REFERENCE_DATE):
+    n_companies = len(companies_df)
+    if n_offers is None:
+        company_positions = np.repeat(np.arange(n_companies), rng.integers(1, 4, n_companies))
+    else:
+        company_positions = np.sort(rng.integers(0, n_companies, n_offers))
+    n_offers = len(company_positions)
+    # Rang de l'offre au sein de son entreprise (les positions sont triées par entreprise)
+    group_starts = np.searchsorted(company_positions, company_positions)
+    offer_ranks = np.arange(n_offers) - group_starts + 1
+
+    sectors = companies_df['sector'].to_numpy()[company_positions]
+    titles_table = np.array([JOB_TITLES[sector] for sector in SECTORS], dtype=object)
+    sector_codes = pd.Categorical(sectors, categories=SECTORS).codes
+    titles = titles_table[sector_codes, rng.integers(0, titles_table.shape[1], n_offers)]
+
+    return pd.DataFrame({
+        'id': np.char.add(np.char.add(_ids('O', company_positions + 1), '_'), offer_ranks.astype(str)),
+        'company_id': companies_df['id'].to_numpy()[company_positions],
+        'company_name': companies_df['name'].to_numpy()[company_positions],
+        'title': titles,
+        'sector': sectors,
+        'contract_type': rng.choice(CONTRACT_TYPES, n_offers),
+        'required_qualification': rng.choice(QUALIFICATIONS, n_offers),
+        'required_skills': _sample_lists(rng, n_offers, SKILLS, 2, 5),
+        'required_experience': rng.choice([0, 1, 2, 3], n_offers),
+        'location': companies_df['location'].to_numpy()[company_positions],
+        'publication_date': _dates(rng, n_offers, 1, 30, reference_date),
+        'status': rng.choice(OFFER_STATUSES, n_offers),
+        'applications': rng.integers(0, 11, n_offers),
+    })
+
+
+def generate_synthetic_data(n_young=30, n_companies=10, n_offers=None, seed=DEFAULT_SEED, reference_date=REFERENCE_DATE):
+    rng = np.random.default_rng(seed)
+    young_people_df = generate_young_people(rng, n_young, reference_date)
+    companies_df = generate_companies(rng, n_companies, reference_date)
+    job_offers_df = generate_job_offers(rng, companies_df, n_offers, reference_date)
+    return young_people_df, companies_df, job_offers_df
+
+
+# Écriture / lecture sur disque (en CSV, les listes sont jointes par LIST_SEPARATOR)
+FRAME_NAMES = ['jeunes', 'entreprises', 'offres']
+
+
+def write_synthetic_data(frames, output_dir, file_format='csv'):
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for name, frame in zip(FRAME_NAMES, frames):
+        path = os.path.join(output_dir, f'{name}.{file_format}')
+        if file_format == 'parquet':
+            frame.to_parquet(path, index=False)
+        else:
+            frame = frame.copy()
+            for column in LIST_COLUMNS:
+                if column in frame:
+                    frame[column] = frame[column].str.join(LIST_SEPARATOR)
+            frame.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def load_synthetic_data(output_dir, file_format='csv'):
+    frames = []
+    for name in FRAME_NAMES:
+        path = os.path.join(output_dir, f'{name}.{file_format}')
+        if file_format == 'parquet':
+            frame = pd.read_parquet(path)
+            for column in LIST_COLUMNS:
+                if column in frame:
+                    frame[column] = frame[column].map(list)
+        else:
+            frame = pd.read_csv(path)
+            for column in LIST_COLUMNS:
+                if column in frame:
+                    frame[column] = frame[column].fillna('').str.split(LIST_SEPARATOR)
+        frames.append(frame)
+    return tuple(frames)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génération d'un jeu de données synthétique reproductible")
+    parser.add_argument("--young", type=int, default=1000, help="Nombre de jeunes")
+    parser.add_argument("--companies", type=int, default=100, help="Nombre d'entreprises")
+    parser.add_argument("--offers", type=int, default=None, help="Nombre d'offres (par défaut : 1 à 3 par entreprise)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--reference-date", default=REFERENCE_DATE, help="Date de référence des dates générées")
+    parser.add_argument("--output", default="donnees_synthetiques", help="Dossier de sortie")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    args = parser.parse_args()
+
+    frames = generate_synthetic_data(args.young, args.companies, args.offers, args.seed, args.reference_date)
+    for path, frame in zip(write_synthetic_data(frames, args.output, args.format), frames):
+        print(f"{path} : {len(frame)} lignes")
@@ -0,0 +1,130 @@
+# Apprentissage hors ligne des poids du score à partir du suivi des mises en relation
+# Chaque mise en relation terminée (Embauche = 1, Refus employeur ou Refus candidat = 0) devient une ligne
+# de caractéristiques : la part obtenue de chaque critère du score pour le couple jeune / offre (composantes
+# du score calculées avec des poids unitaires, entre 0 et 1).
+# Le journal est lu par morceaux : une première passe garde le dernier statut de chaque mise en relation,
+# une seconde calcule les caractéristiques par lots et ajuste une régression logistique (SGDClassifier,
+# partial_fit) lot par lot. Les coefficients positifs, ramenés à un total de 100, forment un profil de
+# score ajouté au fichier des profils.
+#
+# Utilisation : python apps/train_scoring_profile.py --profile-name "Appris (suivi)" --epochs 5
+import sys
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+
+from follow_up_store import FOLLOW_UP_LOG_PATH, REJECTED_STATUSES
+from matching_engine import (
+    COMPONENTS, build_vocabularies, encode_young_people, encode_job_offers, take_rows, criterion_points,
+    compile_scoring_plan, load_commune_coordinates, distance_matrix
+)
+from scoring_profiles import SCORING_PROFILES_PATH, save_scoring_profile
+from synthetic_data import generate_synthetic_data, load_synthetic_data, DEFAULT_SEED
+
+HIRED_STATUS = 'Embauche'
+OUTCOME_STATUSES = [HIRED_STATUS] + REJECTED_STATUSES
+DEFAULT_CHUNK_SIZE = 50000
+
+# Poids unitaires : les points de chaque critère valent sa part obtenue (0 à 1)
+UNIT_PLAN = compile_scoring_plan({criterion: 1 for criterion in COMPONENTS})
+
+
+# Dernier statut de chaque mise en relation, en lisant le journal par morceaux (seul l'état courant
+# de chaque mise en relation reste en mémoire) ; les mises en relation encore en cours sont écartées
+def final_outcomes(log_path=FOLLOW_UP_LOG_PATH, chunk_size=DEFAULT_CHUNK_SIZE):
+    state = pd.DataFrame(columns=['match_id', 'status', 'young_id', 'offer_id'])
+    for chunk in pd.read_csv(log_path, usecols=['match_id', 'status', 'young_id', 'offer_id'], dtype=str, chunksize=chunk_size):
+        latest = chunk.drop_duplicates('match_id', keep='last')
+        state = pd.concat([state[~state['match_id'].isin(latest['match_id'])], latest], ignore_index=True)
+    outcomes = state[state['status'].isin(OUTCOME_STATUSES)]
+    return pd.DataFrame({
+        'young_id': outcomes['young_id'].to_numpy(),
+        'offer_id': outcomes['offer_id'].to_numpy(),
+        'hired': (outcomes['status'] == HIRED_STATUS).to_numpy(dtype=np.int8),
+    })
+
+
+# Caractéristiques (une colonne par critère, dans l'ordre de COMPONENTS) pour des couples de positions
+def outcome_features(young, offers, young_positions, offer_positions, distances=None):
+    points = criterion_points(
+        take_rows(young, young_positions), take_rows(offers, offer_positions), distances, UNIT_PLAN, pairwise=True
+    )
+    return np.column_stack([points[criterion] for criterion in COMPONENTS]).astype(np.float64)
+
+
+# Ajustement par lots de mises en relation (plusieurs passages possibles) ; les couples dont le jeune
+# ou l'offre n'existe plus dans les données sont ignorés
+def fit_outcome_model(outcomes, young, offers, distances=None, chunk_size=DEFAULT_CHUNK_SIZE, epochs=5, seed=DEFAULT_SEED):
+    young_positions = pd.Index(young['ids']).get_indexer(outcomes['young_id'])
+    offer_positions = pd.Index(offers['ids']).get_indexer(outcomes['offer_id'])
+    known = (young_positions >= 0) & (offer_positions >= 0)
+    young_positions, offer_positions = young_positions[known], offer_positions[known]
+    labels = outcomes['hired'].to_numpy()[known]
+    if len(np.unique(labels)) < 2:
+        raise ValueError("Il faut au moins une embauche et un refus dans le suivi pour apprendre des poids")
+    model = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=seed)
+    for _ in range(epochs):
+        for start in range(0, len(labels), chunk_size):
+            rows = slice(start, start + chunk_size)
+            features = outcome_features(young, offers, young_positions[rows], offer_positions[rows], distances)
+            model.partial_fit(features, labels[rows], classes=[0, 1])
+    return model, int(known.sum()), int(labels.sum())
+
+
+# Poids entiers de total 100 proportionnels aux coefficients positifs (plus forts restes)
+def coefficients_to_weights(coefficients):
+    positive = np.clip(np.asarray(coefficients, dtype=np.float64), 0, None)
+    if not positive.sum():
+        raise ValueError("Aucun critère n'est associé positivement aux embauches : profil non exporté")
+    shares = positive / positive.sum() * 100
+    weights = np.floor(shares).astype(np.int64)
+    weights[np.argsort(weights - shares, kind='stable')[:100 - weights.sum()]] += 1
+    return dict(zip(COMPONENTS, weights.tolist()))
+
+
+def train_scoring_profile(young_people_df, job_offers_df, log_path=FOLLOW_UP_LOG_PATH, chunk_size=DEFAULT_CHUNK_SIZE,
+                          epochs=5, mobility=False, seed=DEFAULT_SEED):
+    vocabularies = build_vocabularies(young_people_df, job_offers_df)
+    young = encode_young_people(young_people_df, vocabularies)
+    offers = encode_job_offers(job_offers_df, vocabularies)
+    distances = distance_matrix(vocabularies['locations'], load_commune_coordinates()) if mobility else None
+    outcomes = final_outcomes(log_path, chunk_size)
+    model, n_outcomes, n_hired = fit_outcome_model(outcomes, young, offers, distances, chunk_size, epochs, seed)
+    return {
+        'description': f"Appris le {datetime.now().strftime('%Y-%m-%d')} sur {n_outcomes} mises en relation terminées "
+                       f"({n_hired} embauches)",
+        'weights': coefficients_to_weights(model.coef_[0]),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apprentissage d'un profil de score à partir du suivi des mises en relation")
+    parser.add_argument("--log", default=FOLLOW_UP_LOG_PATH, help="Journal du suivi des mises en relation (CSV)")
+    parser.add_argument("--data", default=None, help="Dossier des données (jeunes, entreprises, offres) ; par défaut, "
+                                                     "données simulées de l'application")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Lignes lues / couples traités par lot")
+    parser.add_argument("--epochs", type=int, default=5, help="Nombre de passages sur les mises en relation")
+    parser.add_argument("--mobility", action="store_true", help="Critère de localisation selon le rayon de mobilité du jeune")
+    parser.add_argument("--profile-name", default="Appris (suivi)", help="Nom du profil exporté")
+    parser.add_argument("--profiles", default=SCORING_PROFILES_PATH, help="Fichier des profils de score")
+    args = parser.parse_args()
+
+    if args.data:
+        young_people_df, _, job_offers_df = load_synthetic_data(args.data, args.format)
+    else:
+        young_people_df, _, job_offers_df = generate_synthetic_data(
+            n_young=30, n_companies=10, seed=DEFAULT_SEED, reference_date=datetime.now().strftime('%Y-%m-%d')
+        )
+    try:
+        profile = train_scoring_profile(
+            young_people_df, job_offers_df, args.log, args.chunk_size, args.epochs, args.mobility
+        )
+    except ValueError as error:
+        sys.exit(str(error))
+    save_scoring_profile(args.profile_name, profile, args.profiles)
+    print(f"Profil « {args.profile_name} » : {profile['description']}")
+    print(", ".join(f"{criterion} {weight}" for criterion, weight in profile['weights'].items()))
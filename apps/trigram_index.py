@@ -0,0 +1,110 @@
+# Index de n-grammes pour la recherche de sous-chaînes (noms de jeunes, entreprises, intitulés)
+# Les textes sont normalisés (minuscules, sans accents). L'index porte sur les valeurs distinctes de chaque
+# champ (une entreprise ou un intitulé revient dans de nombreux documents) ; chaque document garde le numéro
+# de sa valeur dans chaque champ. Les listes de positions couvrent les n-grammes de 1 à 3 caractères :
+# - une requête de 3 caractères au plus est exactement un n-gramme : résultat direct, sans vérification ;
+# - au-delà, l'intersection des listes de ses trigrammes donne les valeurs candidates, vérifiées une seule
+#   fois par valeur distincte.
+# Les documents retenus sont ceux dont une valeur correspond (lecture vectorisée des numéros de valeur).
+import unicodedata
+
+import numpy as np
+
+MAX_GRAM = 3
+
+
+def fold(text):
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def grams(text, size):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def trigrams(text):
+    return grams(text, 3)
+
+
+# Valeurs distinctes d'un champ et listes de leurs numéros par n-gramme
+class _FieldIndex:
+    def __init__(self):
+        self.values = []
+        self.ids = {}
+        # n-gramme -> [numéros de valeur croissants (tampon à capacité doublée), nombre de numéros]
+        self.postings = {}
+
+    def value_id(self, raw_value):
+        value_id = self.ids.get(raw_value)
+        if value_id is not None:
+            return value_id
+        value_id = self.ids[raw_value] = len(self.values)
+        value = fold(raw_value)
+        self.values.append(value)
+        for size in range(1, MAX_GRAM + 1):
+            for gram in grams(value, size):
+                entry = self.postings.get(gram)
+                if entry is None:
+                    entry = self.postings[gram] = [np.empty(4, dtype=np.int64), 0]
+                if entry[1] == len(entry[0]):
+                    entry[0] = np.concatenate([entry[0], np.empty_like(entry[0])])
+                entry[0][entry[1]] = value_id
+                entry[1] += 1
+        return value_id
+
+    def _positions(self, gram):
+        entry = self.postings.get(gram)
+        return entry[0][:entry[1]] if entry is not None else np.empty(0, dtype=np.int64)
+
+    # Masque des valeurs contenant query (déjà normalisée, non vide)
+    def matches(self, query):
+        matched = np.zeros(len(self.values), dtype=bool)
+        if len(query) <= MAX_GRAM:
+            matched[self._positions(query)] = True
+            return matched
+        # Intersection en partant de la liste la plus courte (recherche dichotomique dans les autres)
+        postings = sorted((self._positions(trigram) for trigram in trigrams(query)), key=len)
+        candidates = postings[0]
+        for positions in postings[1:]:
+            if not len(candidates):
+                return matched
+            slots = np.minimum(np.searchsorted(positions, candidates), len(positions) - 1)
+            candidates = candidates[positions[slots] == candidates]
+        values = self.values
+        matched[[value_id for value_id in candidates.tolist() if query in values[value_id]]] = True
+        return matched
+
+
+class TrigramIndex:
+    def __init__(self):
+        self.fields = []
+        # Par champ : numéro de valeur de chaque document (tampon à capacité doublée)
+        self.value_ids = []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, *fields):
+        if not self.fields:
+            self.fields = [_FieldIndex() for _ in fields]
+            self.value_ids = [np.empty(1024, dtype=np.int64) for _ in fields]
+        position = self.size
+        if position == len(self.value_ids[0]):
+            self.value_ids = [np.concatenate([ids, np.empty_like(ids)]) for ids in self.value_ids]
+        for field, ids, value in zip(self.fields, self.value_ids, fields):
+            ids[position] = field.value_id(value)
+        self.size += 1
+        return position
+
+    # Positions (croissantes) des documents dont un champ contient query
+    def search(self, query):
+        query = fold(query)
+        if not query:
+            return np.arange(self.size)
+        found = np.zeros(self.size, dtype=bool)
+        for field, ids in zip(self.fields, self.value_ids):
+            matched = field.matches(query)
+            if matched.any():
+                found |= matched[ids[:self.size]]
+        return np.flatnonzero(found)
@@ -0,0 +1,172 @@
+# Typage compact des tables jeunes / entreprises / offres
+# Les colonnes de libellés (statut, secteur, contrat, qualification, localisation) deviennent des
+# catégories pandas à ordre fixe : les filtres isin et les regroupements travaillent sur les codes
+# entiers au lieu de comparer des chaînes. Les âges et années passent en petits entiers.
+import numpy as np
+import pandas as pd
+
+from shared_lru import SharedLRU
+from synthetic_data import (
+    SECTORS, CONTRACT_TYPES, LOCATIONS, QUALIFICATIONS, YOUNG_STATUSES, OFFER_STATUSES
+)
+
+COMPANY_SIZES = ['TPE', 'PME', 'Grande entreprise']
+PARTNERSHIP_LEVELS = ['Nouveau', 'Régulier', 'Partenaire privilégié']
+
+# Colonne -> (catégories dans l'ordre, ordonnée ?) ou type entier
+YOUNG_PEOPLE_SCHEMA = {
+    'status': (YOUNG_STATUSES, False),
+    'qualification': (QUALIFICATIONS, True),
+    'preferred_location': (LOCATIONS, False),
+    'age': np.int8,
+    'experience_years': np.int8,
+    'mobility': np.int16,
+}
+
+JOB_OFFERS_SCHEMA = {
+    'status': (OFFER_STATUSES, False),
+    'sector': (SECTORS, False),
+    'contract_type': (CONTRACT_TYPES, False),
+    'required_qualification': (QUALIFICATIONS, True),
+    'location': (LOCATIONS, False),
+    'required_experience': np.int8,
+    'applications': np.int16,
+}
+
+COMPANIES_SCHEMA = {
+    'sector': (SECTORS, False),
+    'size': (COMPANY_SIZES, False),
+    'location': (LOCATIONS, False),
+    'partnership_level': (PARTNERSHIP_LEVELS, False),
+}
+
+
+# Catégories fixes, complétées (en fin de liste) par les valeurs absentes du référentiel
+def _categorical(column, categories, ordered):
+    extra = sorted(set(column.dropna().unique()) - set(categories), key=str)
+    return pd.Categorical(column, categories=list(categories) + extra, ordered=ordered)
+
+
+def apply_schema(df, schema):
+    typed = df.copy()
+    for column, dtype in schema.items():
+        if column not in typed:
+            continue
+        if isinstance(dtype, tuple):
+            typed[column] = _categorical(typed[column], *dtype)
+        else:
+            typed[column] = typed[column].astype(dtype)
+    return typed
+
+
+def memory_usage(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+# Conversion des trois tables et rapport de la mémoire économisée par table
+def type_frames(young_people_df, companies_df, job_offers_df):
+    frames = {}
+    report = []
+    for name, df, schema in [
+        ('Jeunes', young_people_df, YOUNG_PEOPLE_SCHEMA),
+        ('Entreprises', companies_df, COMPANIES_SCHEMA),
+        ('Offres', job_offers_df, JOB_OFFERS_SCHEMA),
+    ]:
+        typed = apply_schema(df, schema)
+        before, after = memory_usage(df), memory_usage(typed)
+        frames[name] = typed
+        report.append({
+            'Table': name,
+            'Avant (Ko)': round(before / 1024, 1),
+            'Après (Ko)': round(after / 1024, 1),
+            'Économie (%)': round((1 - after / before) * 100, 1) if before else 0.0,
+        })
+    return frames['Jeunes'], frames['Entreprises'], frames['Offres'], pd.DataFrame(report)
+
+
+# Masque booléen "valeur parmi values" calculé sur les codes entiers d'une colonne catégorielle
+# (table de correspondance code -> booléen, le code -1 des valeurs manquantes tombe sur la dernière case)
+def category_mask(column, values):
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        return column.isin(values).to_numpy()
+    lookup = np.zeros(len(column.cat.categories) + 1, dtype=bool)
+    lookup[column.cat.categories.get_indexer([value for value in values if value in column.cat.categories])] = True
+    return lookup[column.cat.codes.to_numpy()]
+
+
+# Décompte par valeur d'une colonne catégorielle sur les lignes du masque (facettes des filtres),
+# par comptage des codes entiers ; les valeurs absentes sont omises
+def category_counts(column, mask=None):
+    codes = column.cat.codes.to_numpy()
+    if mask is not None:
+        codes = codes[mask]
+    counts = np.bincount(codes[codes >= 0], minlength=len(column.cat.categories))
+    return {label: int(count) for label, count in zip(column.cat.categories, counts) if count}
+
+
+# Cache LRU des masques de filtres, partagé entre les pages et les sessions. Clé : (version des données,
+# table, colonne, valeurs sélectionnées) ; changer un filtre ne recalcule que le masque de ce filtre.
+# Les masques mis en cache sont en lecture seule.
+class FilterMaskCache:
+    def __init__(self, max_entries=256):
+        self.masks = SharedLRU(max_entries)
+
+    @staticmethod
+    def _read_only(mask):
+        mask = np.asarray(mask, dtype=bool)
+        mask.flags.writeable = False
+        return mask
+
+    def mask(self, version, table, column, values, compute):
+        return self.masks.get((version, table, column, frozenset(values)), lambda: self._read_only(compute()))
+
+
+# ET logique de masques booléens (toutes les lignes si aucun masque)
+def combine_masks(masks, size):
+    combined = np.ones(size, dtype=bool)
+    for mask in masks:
+        combined &= mask
+    return combined
+
+
+# Colonnes multi-valuées (compétences, secteurs, contrats) au format CSR : pour la ligne i, les codes
+# des libellés sont values[offsets[i]:offsets[i + 1]]. 'rows' donne la ligne de chaque valeur, ce qui
+# permet de répondre aux requêtes "au moins un" et "nombre en commun" sans objet Python.
+def to_csr(column, labels=None):
+    lengths = np.fromiter((len(cell) for cell in column), dtype=np.int64, count=len(column))
+    flat = [value for cell in column for value in cell]
+    if labels is None:
+        labels = sorted(set(flat), key=str)
+    codes = pd.Categorical(flat, categories=labels).codes.astype(np.int32)
+    offsets = np.zeros(len(column) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return {
+        'offsets': offsets,
+        'values': codes,
+        'rows': np.repeat(np.arange(len(column), dtype=np.int64), lengths),
+        'labels': pd.Index(labels),
+    }
+
+
+def _wanted_codes(csr, wanted):
+    codes = csr['labels'].get_indexer(list(wanted))
+    return np.unique(codes[codes >= 0])
+
+
+# Nombre de libellés de wanted présents dans chaque ligne
+def csr_count_overlap(csr, wanted):
+    codes = _wanted_codes(csr, wanted)
+    lookup = np.zeros(len(csr['labels']) + 1, dtype=bool)
+    lookup[codes] = True
+    hits = lookup[csr['values']]
+    return np.bincount(csr['rows'][hits], minlength=len(csr['offsets']) - 1)
+
+
+# Lignes contenant au moins un des libellés de wanted
+def csr_any_of(csr, wanted):
+    return csr_count_overlap(csr, wanted) > 0
+
+
+# Libellés effectivement présents dans la colonne (options des filtres)
+def csr_labels(csr):
+    return csr['labels'][np.unique(csr['values'][csr['values'] >= 0])].tolist()
@@ -0,0 +1,5 @@
+# Les modules de l'application sont importés par leur nom depuis apps/ (comme dans les scripts)
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'apps'))
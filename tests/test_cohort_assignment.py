@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from cohort_assignment import candidate_graph, stable_assignment, blocking_pairs
+from matching_engine import build_vocabularies, encode_young_people, encode_job_offers
+from synthetic_data import generate_synthetic_data
+
+
+@pytest.fixture(scope='module')
+def graph():
+    young_people_df, _, job_offers_df = generate_synthetic_data(n_young=400, n_companies=40, n_offers=150, seed=5)
+    vocabularies = build_vocabularies(young_people_df, job_offers_df)
+    young = encode_young_people(young_people_df, vocabularies)
+    offers = encode_job_offers(job_offers_df, vocabularies)
+    return candidate_graph(young, offers, proposal_limit=8, min_score=40)
+
+
+@pytest.mark.parametrize('capacity', [1, 3, 'per_offer'])
+def test_stable_assignment_has_no_blocking_pairs(graph, capacity):
+    if capacity == 'per_offer':
+        capacity = np.random.default_rng(0).integers(0, 4, graph['n_offers'])
+    assignment = stable_assignment(graph, capacity)
+    assert len(np.unique(assignment['young'])) == len(assignment['young'])
+    assert (np.bincount(assignment['offers'], minlength=graph['n_offers']) <= capacity).all()
+    assert len(blocking_pairs(graph, assignment, capacity)) == 0
+
+
+# Le contrôle n'est pas vide : retirer une affectation libère une place que le jeune retiré convoite
+def test_blocking_pairs_detects_an_unstable_assignment(graph):
+    assignment = stable_assignment(graph)
+    dropped = assignment['young'][0]
+    kept = slice(1, None)
+    unstable = {key: assignment[key][kept] for key in ['young', 'offers', 'scores', 'choice']}
+    pairs = blocking_pairs(graph, unstable)
+    assert [dropped, assignment['offers'][0]] in pairs.tolist()
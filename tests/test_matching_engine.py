@@ -0,0 +1,96 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from matching_engine import (
+    build_vocabularies, encode_young_people, encode_job_offers, take_rows, score_encoded, score_pairs, top_k,
+    blocked_top_k, MatchMatrix
+)
+from synthetic_data import generate_synthetic_data
+from typed_frames import type_frames
+
+
+@pytest.fixture(scope='module')
+def encoded():
+    young_people_df, _, job_offers_df = generate_synthetic_data(n_young=2000, n_companies=100, n_offers=2000, seed=7)
+    vocabularies = build_vocabularies(young_people_df, job_offers_df)
+    return encode_young_people(young_people_df, vocabularies), encode_job_offers(job_offers_df, vocabularies)
+
+
+# Pic des allocations (en Mo) au-delà de ce qui était alloué avant l'appel
+def traced_peak_mb(function):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = function()
+        return result, (tracemalloc.get_traced_memory()[1] - before) / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize('memory_budget_mb', [4, 16])
+def test_blocked_top_k_stays_within_memory_budget(encoded, memory_budget_mb):
+    young, offers = encoded
+    _, peak_mb = traced_peak_mb(lambda: blocked_top_k(young, offers, k=10, memory_budget_mb=memory_budget_mb))
+    assert peak_mb < memory_budget_mb
+
+
+def test_match_matrix_temporaries_stay_within_memory_budget(encoded):
+    young, offers = encoded
+    matrix, peak_mb = traced_peak_mb(lambda: MatchMatrix(young, offers, memory_budget_mb=8))
+    stored_mb = (matrix.scores.nbytes + matrix.components.nbytes) / (1024 * 1024)
+    assert peak_mb - stored_mb < 8
+
+
+def test_closed_offer_is_never_returned(encoded):
+    young, offers = encoded
+    young, offers = take_rows(young, np.arange(200)), take_rows(offers, np.arange(300))
+    matrix = MatchMatrix(young, offers)
+    all_young, all_offers = np.arange(200), np.arange(300)
+    best_offers = matrix.submatrix(all_young, all_offers).argmax(axis=1)
+    closed = np.unique(best_offers)[:5]
+    for position in closed:
+        matrix.close_offer(position)
+    added = matrix.add_offer(take_rows(offers, [closed[0]]))
+    all_offers = np.arange(301)
+
+    scores = matrix.submatrix(all_young, all_offers)
+    assert (scores[:, closed] == -1).all()
+    assert (matrix.component_submatrix(all_young, closed).view(np.int8) == 0).all()
+    for row in scores:
+        kept = np.flatnonzero(row >= 0)
+        selected = kept[top_k(row[kept], offers['ids'].tolist() + ['ajoutée'], 10)]
+        assert not np.isin(selected, closed).any()
+    # L'offre ajoutée (copie d'une offre clôturée) reste lisible
+    assert (scores[:, added] == score_encoded(young, take_rows(offers, [closed[0]]))[:, 0]).all()
+
+
+# Score de référence couple par couple (ancien calcul de l'application, pondération 40/20/15/10/10/5)
+def reference_score(young_person, job_offer):
+    skill_overlap = set(young_person['skills']).intersection(job_offer['required_skills'])
+    score = len(skill_overlap) / max(len(job_offer['required_skills']), 1) * 40
+    score += 20 if job_offer['sector'] in young_person['preferred_sectors'] else 0
+    score += 15 if job_offer['contract_type'] in young_person['preferred_contracts'] else 0
+    levels = {'Sans diplôme': 0, 'CAP/BEP': 1, 'Bac': 2, 'Bac+2': 3, 'Bac+3 et plus': 4}
+    score += 10 if levels.get(young_person['qualification'], 0) >= levels.get(job_offer['required_qualification'], 0) else 0
+    score += 10 if young_person['experience_years'] >= job_offer['required_experience'] else 0
+    score += 5 if young_person['preferred_location'] == job_offer['location'] else 0
+    max_score = 40 + 20 + 15 + 10 + 10 + 5
+    return round(score / max_score * 100)
+
+
+def test_vectorized_scores_match_reference_per_pair_score():
+    young_people_df, companies_df, job_offers_df = generate_synthetic_data(n_young=60, n_companies=20, n_offers=80, seed=11)
+    typed_young_people_df, _, typed_job_offers_df, _ = type_frames(young_people_df, companies_df, job_offers_df)
+    vocabularies = build_vocabularies(typed_young_people_df, typed_job_offers_df)
+    young = encode_young_people(typed_young_people_df, vocabularies)
+    offers = encode_job_offers(typed_job_offers_df, vocabularies)
+    expected = np.array([
+        [reference_score(young_person, job_offer) for job_offer in job_offers_df.to_dict('records')]
+        for young_person in young_people_df.to_dict('records')
+    ])
+    assert (score_encoded(young, offers) == expected).all()
+    assert (MatchMatrix(young, offers).submatrix(np.arange(60), np.arange(80)) == expected).all()
+    rows, columns = np.nonzero(np.ones_like(expected, dtype=bool))
+    assert (score_pairs(take_rows(young, rows), take_rows(offers, columns)) == expected.ravel()).all()